@@ -1,7 +1,8 @@
 import os
-import pandas as pd
 from dotenv import load_dotenv
 from openai import OpenAI
+from song_catalog import TOP_K
+from chatbot_logic import get_songs_by_emotion
 
 # 1. .env 파일에 저장된 환경 변수를 불러옵니다.
 load_dotenv()
@@ -72,29 +73,6 @@ def run_emotion_chatbot():
     return user_name, emotion
 
 
-def get_songs_by_emotion(emotion, csv_path):
-    try:
-        # 파일 존재 여부 확인
-        if not os.path.exists(csv_path):
-            print(f"에러: CSV 파일을 찾을 수 없습니다. 경로를 확인하세요: {csv_path}")
-            return []
-
-        df = pd.read_csv(csv_path)
-        required_columns = {'emotion1', 'singer', 'title', 'genre'}
-        
-        if not required_columns.issubset(df.columns):
-            print(f"에러: CSV에 필요한 컬럼이 없습니다: {required_columns}")
-            return []
-
-        # 감정 기준 필터링 (공백 제거 후 비교)
-        filtered = df[df['emotion1'].astype(str).str.strip() == emotion]
-        return filtered[['singer', 'title', 'genre']].to_dict(orient='records')
-
-    except Exception as e:
-        print(f"에러 발생: {e}")
-        return []
-
-
 if __name__ == "__main__":
     # 데이터 경로 설정 (상대 경로 사용 권장)
     CSV_FILE_PATH = 'data/Final_lyrics_emotion_analysis.csv'
@@ -103,7 +81,7 @@ if __name__ == "__main__":
     user_name, emotion = run_emotion_chatbot()
     
     if emotion:
-        mapping_songs = get_songs_by_emotion(emotion, CSV_FILE_PATH)
+        mapping_songs = get_songs_by_emotion(emotion, CSV_FILE_PATH, limit=TOP_K)
 
         print(f"\n추천 노래 리스트 ({emotion} 감정 기반):")
         if not mapping_songs:
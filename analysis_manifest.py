@@ -0,0 +1,102 @@
+import os
+import hashlib
+
+import pandas as pd
+
+from analysis_pipeline import EMOTION_COLUMNS, run_pipeline
+from columnar_store import read_table
+from emotion_labels import to_korean_label
+from polarity_cache import model_fingerprint
+
+KEY_COLUMNS = ['singer', 'title']
+HASH_COLUMNS = ['lyric_hash', 'vocab_hash', 'model_hash']
+MANIFEST_COLUMNS = KEY_COLUMNS + HASH_COLUMNS + EMOTION_COLUMNS
+FINAL_COLUMNS = ['singer', 'title', 'genre'] + EMOTION_COLUMNS
+
+
+def text_hash(text):
+    return hashlib.sha1(str(text).encode('utf-8')).hexdigest()[:16]
+
+
+# 감정 어휘 사전 + 불용어 파일 해시 (둘 중 하나만 바뀌어도 재분석)
+def vocab_fingerprint(vocab_path, stopwords_path):
+    h = hashlib.sha1()
+    for path in (vocab_path, stopwords_path):
+        with open(path, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def load_manifest(manifest_path):
+    if not os.path.exists(manifest_path):
+        return pd.DataFrame(columns=MANIFEST_COLUMNS)
+    return pd.read_csv(manifest_path, dtype=str, keep_default_na=False)
+
+
+def run_incremental(data_path, output_path, manifest_path, vocab_path, stopwords_path, model_checkpoint_path,
+                    cache_path=None, komoran_cache_path=None, workers=1, chunksize=2000, song_chunk_size=100):
+    # manifest : (singer, title) -> (가사/사전/모델 해시, 분석 결과)
+    # 새 곡, 가사가 바뀐 곡, 사전/모델이 바뀐 뒤 분석되지 않은 곡만 다시 분석함
+    vocab_hash = vocab_fingerprint(vocab_path, stopwords_path)
+    model_hash = model_fingerprint(model_checkpoint_path)
+
+    manifest = load_manifest(manifest_path)
+    known = {(row.singer, row.title): (row.lyric_hash, row.vocab_hash, row.model_hash)
+             for row in manifest.itertuples(index=False)}
+
+    df = read_table(data_path)
+    df['lyric_hash'] = df['lyric'].map(text_hash)
+
+    changed = [known.get((singer, title)) != (lyric_hash, vocab_hash, model_hash)
+               for singer, title, lyric_hash in zip(df['singer'], df['title'], df['lyric_hash'])]
+    todo = df[changed].drop_duplicates(subset=KEY_COLUMNS, keep='last')
+    print(f"전체 {len(df)}곡 중 {len(todo)}곡 분석 필요")
+
+    if len(todo) > 0:
+        todo_path = manifest_path + '.todo.csv'
+        done_path = manifest_path + '.done.csv'
+        todo[KEY_COLUMNS + ['lyric', 'lyric_hash']].to_csv(todo_path, index=False, encoding='utf-8-sig')
+        try:
+            run_pipeline(todo_path, done_path, vocab_path, stopwords_path, model_checkpoint_path,
+                         cache_path=cache_path, komoran_cache_path=komoran_cache_path,
+                         workers=workers, chunksize=chunksize,
+                         song_chunk_size=song_chunk_size)
+            done = pd.read_csv(done_path, dtype=str, keep_default_na=False)
+        finally:
+            for path in (todo_path, done_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        done['vocab_hash'] = vocab_hash
+        done['model_hash'] = model_hash
+        # 다시 분석한 곡의 이전 기록을 새 결과로 교체
+        manifest = manifest.set_index(KEY_COLUMNS)
+        manifest = manifest.drop(index=done.set_index(KEY_COLUMNS).index, errors='ignore').reset_index()
+        manifest = pd.concat([manifest, done[MANIFEST_COLUMNS]], ignore_index=True)
+
+        tmp_path = manifest_path + '.tmp'
+        manifest[MANIFEST_COLUMNS].to_csv(tmp_path, index=False, encoding='utf-8-sig')
+        os.replace(tmp_path, manifest_path)
+
+    merge_into_final(df, manifest, output_path)
+    return len(todo)
+
+
+# 입력 곡들의 결과(manifest)로 최종 파일 갱신 (입력에 없는 기존 곡은 그대로 유지)
+def merge_into_final(df, manifest, output_path):
+    results = manifest.drop_duplicates(subset=KEY_COLUMNS, keep='last').set_index(KEY_COLUMNS)[EMOTION_COLUMNS]
+
+    updated = df[[column for column in FINAL_COLUMNS if column in df.columns and column not in EMOTION_COLUMNS]]
+    updated = updated.join(results, on=KEY_COLUMNS)
+    for column in EMOTION_COLUMNS:
+        updated[column] = updated[column].map(lambda x: to_korean_label(x) if x != '' else None)
+
+    if os.path.exists(output_path):
+        final = read_table(output_path)
+        input_keys = pd.MultiIndex.from_frame(df[KEY_COLUMNS])
+        kept = final[~pd.MultiIndex.from_frame(final[KEY_COLUMNS]).isin(input_keys)]
+        updated = pd.concat([updated, kept], ignore_index=True)
+
+    tmp_path = output_path + '.tmp'
+    updated.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+    os.replace(tmp_path, output_path)
@@ -0,0 +1,186 @@
+import os
+import time
+import multiprocessing
+from collections import deque
+
+import pandas as pd
+
+import instrumentation
+from columnar_store import open_store
+from emotion_labels import to_korean_label
+
+EMOTION_COLUMNS = ['emotion1', 'emotion2', 'emotion3']
+
+# 워커 프로세스마다 한 번만 불러오는 자원 (Komoran, vocab, 모델, 캐시)
+_worker = {}
+
+
+def init_worker(vocab_path, stopwords_path, model_checkpoint_path, cache_path=None, komoran_cache_path=None):
+    # 무거운 모듈(TF, Komoran JVM)은 워커 안에서만 불러옴
+    from lyrics_emotion_analysis_KR import load_lexicon, load_model, use_komoran_cache
+    from polarity_cache import PolarityCache, model_fingerprint
+
+    if komoran_cache_path:
+        use_komoran_cache(komoran_cache_path)
+
+    _worker['vocab'] = load_lexicon(vocab_path, stopwords_path)
+    _worker['model'] = load_model(model_checkpoint_path)
+    _worker['cache'] = None
+    if cache_path:
+        _worker['cache'] = PolarityCache(cache_path, fingerprint=model_fingerprint(model_checkpoint_path))
+
+
+# 곡 묶음 하나 분석 -> (pid, 캐시 통계, 곡별 [emotion1, emotion2, emotion3])
+def analyze_songs(lyrics):
+    import lyrics_emotion_analysis_KR
+
+    cache = _worker['cache']
+    results = lyrics_emotion_analysis_KR.hybrid_emotion_analysis_batch(
+        lyrics, _worker['model'], _worker['vocab'], cache=cache)
+    return os.getpid(), _worker_stats(), results
+
+
+# 컬럼 저장소의 행 범위 분석 : 가사를 프로세스 간에 복사하지 않고 워커가 mmap으로 직접 읽음
+def analyze_store_rows(task):
+    store_path, start, stop = task
+    stores = _worker.setdefault('stores', {})
+    if store_path not in stores:
+        from columnar_store import ColumnStore
+        stores[store_path] = ColumnStore(store_path)
+    return analyze_songs(stores[store_path].column('lyric').to_numpy(start, stop).tolist())
+
+
+def _worker_stats():
+    import lyrics_emotion_analysis_KR
+
+    stats = {'komoran': lyrics_emotion_analysis_KR.get_komoran_tokenizer().stats()}
+    if _worker['cache'] is not None:
+        stats['polarity'] = _worker['cache'].stats()
+    if instrumentation.enabled():
+        stats['instrumentation'] = instrumentation.snapshot()
+    return stats
+
+
+def _print_stats(worker_stats):
+    from polarity_cache import format_stats, merge_stats
+    from lyrics_preprocessing import format_komoran_stats
+
+    polarity = [stats['polarity'] for stats in worker_stats.values() if 'polarity' in stats]
+    if polarity:
+        print(format_stats(merge_stats(polarity)))
+
+    komoran = [stats['komoran'] for stats in worker_stats.values()]
+    if komoran:
+        total = {key: sum(s[key] for s in komoran) for key in ('hits', 'misses', 'jvm_calls')}
+        lookups = total['hits'] + total['misses']
+        total['hit_rate'] = total['hits'] / lookups if lookups else 0.0
+        print(format_komoran_stats(total))
+
+
+def _song_batches(lyrics, song_chunk_size):
+    return [lyrics[start:start + song_chunk_size] for start in range(0, len(lyrics), song_chunk_size)]
+
+
+class _InProcessResult:
+    # 워커 1개일 때 Pool 없이 같은 인터페이스로 실행
+    def __init__(self, batches):
+        self.batches = batches
+
+    def get(self):
+        return [analyze_songs(batch) for batch in self.batches]
+
+
+def run_pipeline(data_path, output_path, vocab_path, stopwords_path, model_checkpoint_path,
+                 cache_path=None, komoran_cache_path=None, workers=1, chunksize=2000, song_chunk_size=100,
+                 max_inflight_chunks=2):
+    # CSV를 chunksize 행씩 읽어 곡 묶음(song_chunk_size)을 워커에 나눠주고,
+    # 끝난 chunk부터 순서대로 출력 파일에 이어 씀 (메모리 사용량은 chunk 수에만 비례)
+    init_args = (vocab_path, stopwords_path, model_checkpoint_path, cache_path, komoran_cache_path)
+    pool = None
+    if workers > 1:
+        # TF는 fork 이후 안전하지 않으므로 spawn 사용
+        pool = multiprocessing.get_context('spawn').Pool(workers, initializer=init_worker, initargs=init_args)
+    else:
+        init_worker(*init_args)
+
+    tmp_path = output_path + '.tmp'
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+
+    cache_stats = {}
+    n_songs = 0
+    start = time.time()
+    try:
+        with open(tmp_path, 'w', encoding='utf-8-sig', newline='') as f:
+            header = True
+            inflight = deque()
+
+            def write_oldest():
+                nonlocal header, n_songs
+                df, async_result = inflight.popleft()
+                emotion_labels = []
+                for pid, stats, results in async_result.get():
+                    if stats:
+                        cache_stats[pid] = stats
+                        if 'instrumentation' in stats:
+                            instrumentation.update_remote(pid, stats['instrumentation'])
+                    emotion_labels.extend(results)
+
+                # analysis_manifest.merge_into_final과 같은 한국어 라벨 (없는 값은 빈 칸, 숫자 코드가 실수로 바뀌지 않게)
+                emotion_labels = [[to_korean_label(code) if code is not None else '' for code in labels]
+                                  for labels in emotion_labels]
+                df[EMOTION_COLUMNS] = pd.DataFrame(emotion_labels, index=df.index, columns=EMOTION_COLUMNS)
+                if 'lyric' not in df.columns:
+                    # 저장소에서 읽은 chunk는 가사 없이 들고 있다가 쓰기 직전에 그 chunk만 디코딩
+                    df.insert(store.names.index('lyric'), 'lyric',
+                              store.column('lyric').to_numpy(df.index[0], df.index[-1] + 1))
+                with instrumentation.timer('csv_write'):
+                    df.to_csv(f, header=header, index=False)
+                    f.flush()
+                header = False
+                n_songs += len(df)
+                print(f"{n_songs}곡 완료 ({n_songs / (time.time() - start):.1f} songs/sec)")
+
+            # 최신 컬럼 저장소(columnar_store.py로 생성)가 있으면 CSV 대신 사용
+            store = open_store(data_path)
+            if store is None:
+                frames = pd.read_csv(data_path, chunksize=chunksize)
+            elif pool is not None:
+                # 가사는 워커가 저장소에서 직접 읽으므로 부모는 나머지 컬럼만 읽음
+                frames = store.iter_frames([name for name in store.names if name != 'lyric'], chunksize=chunksize)
+            else:
+                frames = store.iter_frames(chunksize=chunksize)
+            while True:
+                with instrumentation.timer('csv_read'):
+                    df = next(frames, None)
+                if df is None:
+                    break
+                if pool is not None and store is not None:
+                    tasks = [(store.store_path, i, min(i + song_chunk_size, df.index[-1] + 1))
+                             for i in range(df.index[0], df.index[-1] + 1, song_chunk_size)]
+                    inflight.append((df, pool.map_async(analyze_store_rows, tasks, chunksize=1)))
+                else:
+                    batches = _song_batches(df['lyric'].tolist(), song_chunk_size)
+                    if pool is not None:
+                        inflight.append((df, pool.map_async(analyze_songs, batches, chunksize=1)))
+                    else:
+                        inflight.append((df, _InProcessResult(batches)))
+
+                # 다음 chunk를 미리 넣어 두어 chunk 경계에서 코어가 놀지 않게 함
+                if len(inflight) >= max_inflight_chunks:
+                    write_oldest()
+
+            while inflight:
+                write_oldest()
+
+        os.replace(tmp_path, output_path)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        else:
+            cache_stats[os.getpid()] = _worker_stats()
+            if _worker['cache'] is not None:
+                _worker['cache'].close()
+
+    _print_stats(cache_stats)
+    return n_songs
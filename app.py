@@ -1,6 +1,7 @@
 import streamlit as st
-import time
-from chatbot_logic import EmotionChatBot, get_songs_by_emotion
+from chatbot_logic import EmotionChatBot
+from local_emotion import load_default_analyzer
+import instrumentation
 
 # 페이지 설정
 st.set_page_config(page_title="감정 기반 음악 추천 봇", page_icon="🎵")
@@ -68,10 +69,15 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# 로컬 감정 분석기 (모델은 프로세스당 한 번만 불러와 모든 세션이 공유)
+@st.cache_resource
+def get_emotion_analyzer():
+    return load_default_analyzer()
+
 # 세션 상태 초기화
 if "chatbot" not in st.session_state:
     try:
-        st.session_state.chatbot = EmotionChatBot()
+        st.session_state.chatbot = EmotionChatBot(emotion_analyzer=get_emotion_analyzer())
     except ValueError as e:
         st.error(f"초기화 오류: {e}")
         st.stop()
@@ -115,17 +121,13 @@ if not st.session_state.chat_finished:
                 st.session_state.chat_finished = True
                 st.rerun() # 상태 업데이트를 위해 리런
             else:
-                # 일반 대화 응답
-                response_text = st.session_state.chatbot.get_response(prompt)
-                
-                # 스트리밍 효과 (선택 사항)
-                for chunk in response_text.split():
-                    full_response += chunk + " "
-                    time.sleep(0.05)
+                # 일반 대화 응답 (모델이 보내는 조각을 받는 대로 표시)
+                for chunk in st.session_state.chatbot.stream_response(prompt):
+                    full_response += chunk
                     message_placeholder.markdown(full_response + "▌")
                 message_placeholder.markdown(full_response)
                 
-                # 내부 챗봇 객체 상태와 싱크 (이미 get_response에서 messages append 됨)
+                # 내부 챗봇 객체 상태와 싱크 (이미 stream_response에서 messages append 됨)
                 st.session_state.messages.append({"role": "assistant", "content": full_response})
 
 # 감정 분석 및 추천 결과 표시
@@ -147,7 +149,7 @@ if st.session_state.chat_finished:
         
         st.subheader(f"🎧 {emotion}할 때 듣기 좋은 노래")
         
-        songs = get_songs_by_emotion(emotion)
+        songs = st.session_state.chatbot.recommend_songs(emotion, limit=6)
         
         if songs:
             st.markdown("### 🎧 추천 재생목록")
@@ -156,7 +158,7 @@ if st.session_state.chat_finished:
             # 카드형 그리드 레이아웃
             cols = st.columns(2)
             
-            for i, song in enumerate(songs[:6]): # 최대 6개로 (2열 x 3행)
+            for i, song in enumerate(songs): # 최대 6개로 (2열 x 3행)
                 col = cols[i % 2]
                 with col:
                     st.markdown(f"""
@@ -172,3 +174,19 @@ if st.session_state.chat_finished:
     if st.button("다시 시작하기"):
         st.session_state.clear()
         st.rerun()
+
+# 단계별 측정 결과 (LYRICS_INSTRUMENT=1 로 실행했을 때만 표시, 모든 세션 합산)
+if instrumentation.enabled():
+    with st.sidebar.expander("⏱ 성능 측정 (debug)"):
+        snap = instrumentation.snapshot()
+        st.dataframe([{'stage': name, 'calls': stats['calls'], 'total(s)': round(stats['seconds'], 3),
+                       'mean(ms)': round(stats['seconds'] / stats['calls'] * 1000, 2) if stats['calls'] else 0.0,
+                       'max(ms)': round(stats['max_seconds'] * 1000, 2)}
+                      for name, stats in sorted(snap['timers'].items(), key=lambda item: -item[1]['seconds'])],
+                     use_container_width=True)
+        if snap['counters']:
+            st.json(snap['counters'])
+        st.code(instrumentation.prometheus_text(snap), language=None)
+        if st.button("측정 초기화"):
+            instrumentation.reset()
+            st.rerun()
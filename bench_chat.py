@@ -0,0 +1,121 @@
+import json
+import math
+import time
+import argparse
+
+from openai import OpenAI
+
+from chat_replay import ReplayServer, load_fixtures, recording_http_client
+from chatbot_logic import EmotionChatBot
+
+# 기본 대화 시나리오 (--conversations로 JSON 파일 지정 가능 : [["발화1", "발화2", ...], ...])
+DEFAULT_CONVERSATIONS = [
+    ["오늘 회사에서 너무 힘든 일이 있었어", "상사한테 혼나고 나니까 눈물이 나더라", "그냥 혼자 있고 싶어"],
+    ["오랜만에 친구들이랑 여행 다녀왔어!", "바다에서 수영하고 밤새 놀았어", "너무 즐거웠어"],
+    ["헤어진 사람이 자꾸 생각나", "같이 갔던 카페를 지나가면 그때가 그리워", "다시 만날 수 있을까"],
+]
+DEFAULT_REPLY = "그랬구나. 많이 힘들었겠다. 조금 더 이야기해 줄 수 있을까? 내가 들어줄게."
+
+
+# 최근접 순위 백분위수
+def percentile(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    index = max(0, min(len(values) - 1, math.ceil(p * len(values) / 100) - 1))
+    return values[index]
+
+
+def summarize(timings):
+    return {stage: {'count': len(values),
+                    'p50_ms': percentile(values, 50) * 1000,
+                    'p95_ms': percentile(values, 95) * 1000,
+                    'p99_ms': percentile(values, 99) * 1000}
+            for stage, values in timings.items() if values}
+
+
+def run_benchmark(client, conversations, runs=1, stream=True, emotion_analyzer=None):
+    timings = {'get_response': [], 'stream_response': [], 'time_to_first_token': [],
+               'analyze_emotion': [], 'recommend_songs': [], 'conversation': []}
+
+    for _ in range(runs):
+        for conversation in conversations:
+            conversation_start = time.perf_counter()
+            bot = EmotionChatBot(client=client, emotion_analyzer=emotion_analyzer)
+            for turn in conversation:
+                if stream:
+                    start = time.perf_counter()
+                    first = None
+                    for _chunk in bot.stream_response(turn):
+                        if first is None:
+                            first = time.perf_counter() - start
+                    timings['stream_response'].append(time.perf_counter() - start)
+                    if first is not None:
+                        timings['time_to_first_token'].append(first)
+                else:
+                    start = time.perf_counter()
+                    bot.get_response(turn)
+                    timings['get_response'].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            emotion = bot.analyze_emotion()
+            timings['analyze_emotion'].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            bot.recommend_songs(emotion or "", limit=6)
+            timings['recommend_songs'].append(time.perf_counter() - start)
+            timings['conversation'].append(time.perf_counter() - conversation_start)
+
+    return summarize(timings)
+
+
+def print_report(report):
+    print(f"{'stage':<24}{'count':>8}{'p50(ms)':>12}{'p95(ms)':>12}{'p99(ms)':>12}")
+    for stage, stats in report.items():
+        print(f"{stage:<24}{stats['count']:>8}{stats['p50_ms']:>12.1f}{stats['p95_ms']:>12.1f}{stats['p99_ms']:>12.1f}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="챗봇 대화 흐름 지연 시간 벤치마크 (녹화된 응답 재생)")
+    parser.add_argument('--fixtures', help="녹화된 chat completions 응답 (JSONL)")
+    parser.add_argument('--record', help="실제 API를 호출하면서 응답을 이 파일(JSONL)에 녹화")
+    parser.add_argument('--conversations', help="대화 시나리오 JSON 파일")
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.3, help="응답/첫 조각 전 주입 지연 (초)")
+    parser.add_argument('--chunk-latency', type=float, default=0.02, help="스트리밍 조각 사이 주입 지연 (초)")
+    parser.add_argument('--no-stream', action='store_true', help="get_response(비스트리밍)로 측정")
+    parser.add_argument('--local-analyzer', action='store_true', help="로컬 감정 분석기 사용")
+    parser.add_argument('--output', help="결과 JSON 저장 경로")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    conversations = DEFAULT_CONVERSATIONS
+    if args.conversations:
+        with open(args.conversations, 'r', encoding='utf-8') as f:
+            conversations = json.load(f)
+
+    emotion_analyzer = None
+    if args.local_analyzer:
+        from local_emotion import load_default_analyzer
+        emotion_analyzer = load_default_analyzer()
+
+    if args.record:
+        # 녹화 모드 : 실제 API 호출 (OPENAI_API_KEY 필요)
+        client = OpenAI(http_client=recording_http_client(args.record))
+        report = run_benchmark(client, conversations, runs=1, stream=not args.no_stream,
+                               emotion_analyzer=emotion_analyzer)
+    else:
+        fixtures = load_fixtures(args.fixtures) if args.fixtures else []
+        with ReplayServer(fixtures, latency=args.latency, chunk_latency=args.chunk_latency,
+                          default_reply=DEFAULT_REPLY) as server:
+            client = OpenAI(api_key='replay', base_url=server.base_url, max_retries=0)
+            report = run_benchmark(client, conversations, runs=args.runs, stream=not args.no_stream,
+                                   emotion_analyzer=emotion_analyzer)
+            print(f"fixture hit: {server.hits}, miss (default reply): {server.misses}")
+
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,233 @@
+import sys
+import json
+import time
+import zlib
+import argparse
+import resource
+import statistics
+import tracemalloc
+
+import numpy as np
+
+WORKLOAD_PATH = 'data/Sub_data/preprocessed_data.csv'
+CATALOG_PATH = 'data/Final_lyrics_emotion_analysis.csv'
+VOCAB_PATH = 'data/vocab_9class_500.csv'
+STOPWORDS_PATH = 'data/stopwords.txt'
+STAGES = ('preprocess', 'komoran', 'lexicon_scoring', 'hybrid_analysis', 'load_vocab', 'get_songs_by_emotion')
+REGRESSION_THRESHOLD = 0.2  # 기준 결과보다 이 비율 이상 느려지거나 메모리를 더 쓰면 실패
+# 기준 결과와 같은 작업량으로 측정했는지 확인할 항목
+WORKLOAD_KEYS = ('path', 'songs', 'sentences', 'repeat')
+# 단계별 처리량 단위 (곡/문장 단위가 아닌 단계는 호출/조회 수 기준)
+THROUGHPUT_UNITS = ('songs', 'calls', 'queries')
+# 아주 짧은/작은 단계의 측정 잡음은 무시 (차이가 이보다 작으면 비율과 관계없이 통과)
+MIN_DELTA = {'seconds': 0.005, 'peak_mb': 1.0}
+
+
+class StubPolarityModel:
+    # BERT 대신 쓰는 결정적 긍/부정 모델 (문장 해시의 홀짝, 모델 파일/TF 없이 실행)
+    def predict_sentences(self, sentences):
+        return np.array([zlib.crc32(sentence.encode('utf-8')) % 2 for sentence in sentences], dtype=np.float32)
+
+
+class SkipStage(Exception):
+    pass
+
+
+def _require_komoran():
+    try:
+        from lyrics_emotion_analysis_KR import get_komoran
+        get_komoran()
+    except Exception as e:
+        raise SkipStage(f"Komoran unavailable: {e}")
+
+
+# 단계별 (준비 함수, 측정 함수, 처리량 계산에 쓸 개수)
+# 준비 함수는 반복마다 측정 전에 호출 (캐시 초기화 등), 결과를 측정 함수에 넘김
+def build_stages(lyrics, catalog_path):
+    from lyrics_preprocessing import lyrics_to_corpus, sentence_preprocessing, lexicon_tokenizer_komoran
+    import lyrics_emotion_analysis_KR as analysis
+
+    corpora = [sentence_preprocessing(lyrics_to_corpus(lyric)) for lyric in lyrics]
+    sentences = [sentence for corpus in corpora for sentence in corpus]
+    model = StubPolarityModel()
+    counts = {'songs': len(lyrics), 'sentences': len(sentences)}
+    state = {}
+
+    def lexicon():
+        if 'lexicon' not in state:
+            state['lexicon'] = analysis.load_lexicon(VOCAB_PATH, STOPWORDS_PATH)
+        return state['lexicon']
+
+    def preprocess(_):
+        for lyric in lyrics:
+            sentence_preprocessing(lyrics_to_corpus(lyric))
+
+    def komoran_setup():
+        _require_komoran()
+        return analysis.get_komoran()
+
+    def komoran(kmoran):
+        for sentence in sentences:
+            lexicon_tokenizer_komoran(sentence, kmoran)
+
+    # 형태소 분석 캐시를 채워 둔 상태에서 문장별 사전 점수 계산만 측정
+    def scoring_setup():
+        _require_komoran()
+        analysis.get_komoran_tokenizer().tokenize_batch(sentences)
+        return lexicon()
+
+    def scoring(vocab):
+        for sentence in sentences:
+            analysis.hybrid_emotion_clf(sentence, model, vocab, polarity=1)
+
+    # 곡마다 전체 분석 (형태소 분석 캐시는 매번 비움)
+    def analysis_setup():
+        _require_komoran()
+        analysis.use_komoran_cache(None)
+        return lexicon()
+
+    def hybrid_analysis(vocab):
+        for lyric in lyrics:
+            analysis.hybrid_emotion_analysis(lyric, model, vocab)
+
+    def load_vocab(_):
+        analysis.load_vocab(VOCAB_PATH, STOPWORDS_PATH)
+
+    def songs_setup():
+        from emotion_labels import EMOTION_LABELS
+        try:
+            from chatbot_logic import get_songs_by_emotion
+        except ImportError as e:
+            raise SkipStage(f"chatbot_logic unavailable: {e}")
+        # 카탈로그 읽기는 첫 조회에서 한 번만 일어나므로 측정 전에 미리 읽음
+        get_songs_by_emotion(EMOTION_LABELS['5364'], catalog_path)
+        return get_songs_by_emotion, list(EMOTION_LABELS.values())
+
+    def songs_by_emotion(args):
+        get_songs_by_emotion, emotions = args
+        for emotion in emotions:
+            get_songs_by_emotion(emotion, catalog_path)
+
+    return counts, {
+        'preprocess': (lambda: None, preprocess, counts),
+        'komoran': (komoran_setup, komoran, counts),
+        'lexicon_scoring': (scoring_setup, scoring, counts),
+        'hybrid_analysis': (analysis_setup, hybrid_analysis, counts),
+        'load_vocab': (lambda: None, load_vocab, {'calls': 1}),
+        'get_songs_by_emotion': (songs_setup, songs_by_emotion, {'queries': 9}),
+    }
+
+
+# 반복 측정 (중앙값) + 한 번 더 실행해 tracemalloc 최대 메모리 측정
+def measure(setup, run, counts, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        prepared = setup()
+        start = time.perf_counter()
+        run(prepared)
+        timings.append(time.perf_counter() - start)
+
+    prepared = setup()
+    tracemalloc.start()
+    run(prepared)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    seconds = statistics.median(timings)
+    result = {'seconds': seconds, 'peak_mb': peak / 2 ** 20}
+    for name, count in counts.items():
+        result[f'{name}_per_sec'] = count / seconds if seconds else 0.0
+    return result
+
+
+def run_benchmark(workload_path=WORKLOAD_PATH, catalog_path=CATALOG_PATH, songs=None, repeat=3, stages=STAGES):
+    import pandas as pd
+
+    lyrics = [lyric for lyric in pd.read_csv(workload_path)['lyric'] if isinstance(lyric, str)]
+    lyrics = lyrics[:songs] if songs else lyrics
+    counts, definitions = build_stages(lyrics, catalog_path)
+
+    results = {}
+    for stage in stages:
+        setup, run, stage_counts = definitions[stage]
+        try:
+            results[stage] = measure(setup, run, stage_counts, repeat)
+        except SkipStage as e:
+            results[stage] = {'skipped': str(e)}
+    return {
+        'workload': dict(counts, path=workload_path, repeat=repeat),
+        'stages': results,
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+# 기준 결과와 비교 -> 느려지거나 메모리가 늘어난 단계, 기준에서는 측정했는데 이번에 건너뛴 단계 목록
+# 작업량(입력 파일, 곡/문장 수, 반복 횟수)이 다르면 수치를 비교하지 않고 그 차이를 실패로 반환
+def find_regressions(report, baseline, threshold=REGRESSION_THRESHOLD):
+    workload, base_workload = report['workload'], baseline.get('workload', {})
+    mismatched = [f"workload mismatch ({key}): {base_workload.get(key)} -> {workload.get(key)}"
+                  for key in WORKLOAD_KEYS if workload.get(key) != base_workload.get(key)]
+    if mismatched:
+        return mismatched
+
+    regressions = []
+    for stage, result in report['stages'].items():
+        base = baseline.get('stages', {}).get(stage)
+        if not base or 'skipped' in base:
+            continue
+        if 'skipped' in result:
+            regressions.append(f"{stage} skipped (measured in baseline): {result['skipped']}")
+            continue
+        for key in ('seconds', 'peak_mb'):
+            if result[key] > base[key] * (1 + threshold) and result[key] - base[key] > MIN_DELTA[key]:
+                regressions.append(f"{stage} {key}: {base[key]:.3f} -> {result[key]:.3f}")
+    return regressions
+
+
+def print_report(report):
+    workload = report['workload']
+    print(f"workload: {workload['songs']} songs, {workload['sentences']} sentences ({workload['path']})")
+    print(f"{'stage':<24}{'seconds':>10}{'throughput':>22}{'sentences/s':>14}{'peak(MB)':>10}")
+    for stage, result in report['stages'].items():
+        if 'skipped' in result:
+            print(f"{stage:<24}  SKIPPED {result['skipped']}")
+            continue
+        unit = next(unit for unit in THROUGHPUT_UNITS if f'{unit}_per_sec' in result)
+        throughput = f"{result[f'{unit}_per_sec']:.1f} {unit}/s"
+        sentences = result.get('sentences_per_sec')
+        print(f"{stage:<24}{result['seconds']:>10.3f}{throughput:>22}"
+              f"{sentences if sentences is not None else float('nan'):>14.1f}{result['peak_mb']:>10.1f}")
+    print(f"max RSS: {report['max_rss_mb']:.0f} MB")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="가사 감정 분석 단계별 벤치마크 (BERT 대신 결정적 stub 모델)")
+    parser.add_argument('stages', nargs='*', help=f"측정할 단계 (기본: 전체, {', '.join(STAGES)})")
+    parser.add_argument('--workload', default=WORKLOAD_PATH, help="가사 CSV (lyric 컬럼)")
+    parser.add_argument('--catalog', default=CATALOG_PATH, help="get_songs_by_emotion에 쓸 분석 결과 CSV")
+    parser.add_argument('--songs', type=int, default=None, help="앞에서부터 사용할 곡 수 (기본: 전체)")
+    parser.add_argument('--repeat', type=int, default=3, help="단계마다 반복 횟수 (중앙값 사용)")
+    parser.add_argument('--output', help="결과 JSON 저장 경로")
+    parser.add_argument('--baseline', help="비교할 이전 결과 JSON (느려지면 종료 코드 1)")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD, help="허용할 증가 비율")
+    args = parser.parse_args()
+    unknown = [stage for stage in args.stages if stage not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage: {', '.join(unknown)}")
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    report = run_benchmark(args.workload, args.catalog, songs=args.songs, repeat=args.repeat,
+                           stages=args.stages or STAGES)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = find_regressions(report, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,87 @@
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+# 모듈별 import 시간 예산 (초)과 import 만으로 불러오면 안 되는 무거운 모듈
+IMPORT_BUDGETS = {
+    'emotion_labels': 0.05,
+    'lyrics_preprocessing': 0.05,
+    'polarity_cache': 0.05,
+    'instrumentation': 0.05,
+    'conversation_context': 0.3,
+    'lyrics_emotion_analysis_KR': 0.3,
+    'song_catalog': 1.0,
+    'local_emotion': 1.0,
+    'analysis_pipeline': 1.0,
+    'analysis_manifest': 1.0,
+    'model_training': 1.0,
+    'model_export': 0.3,
+    'ngram_polarity': 0.3,
+    'chatbot_logic': 2.0,
+}
+HEAVY_MODULES = ['tensorflow', 'transformers', 'konlpy', 'jpype', 'torch']
+
+# 새 인터프리터에서 모듈 하나만 import 하고 걸린 시간과 함께 불러온 무거운 모듈을 출력
+_PROBE = '''
+import sys, json, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+'''
+
+
+def measure_import(module, repeat=3):
+    timings, heavy = [], []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                                capture_output=True, text=True)
+        if output.returncode != 0:
+            return {'module': module, 'error': output.stderr.strip().splitlines()[-1:]}
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        timings.append(result['seconds'])
+        heavy = result['heavy']
+    return {'module': module, 'seconds': statistics.median(timings), 'heavy': heavy}
+
+
+def run_benchmark(modules, repeat=3, scale=1.0):
+    results = []
+    for module in modules:
+        result = measure_import(module, repeat)
+        result['budget'] = IMPORT_BUDGETS.get(module, float('inf')) * scale
+        result['ok'] = 'error' not in result and not result['heavy'] and result['seconds'] <= result['budget']
+        results.append(result)
+    return results
+
+
+def print_report(results):
+    print(f"{'module':<30}{'import(ms)':>12}{'budget(ms)':>12}  result")
+    for result in results:
+        if 'error' in result:
+            print(f"{result['module']:<30}{'-':>12}{result['budget'] * 1000:>12.0f}  ERROR {result['error']}")
+            continue
+        status = 'ok' if result['ok'] else 'OVER BUDGET'
+        if result['heavy']:
+            status = 'HEAVY IMPORT ' + ','.join(result['heavy'])
+        print(f"{result['module']:<30}{result['seconds'] * 1000:>12.1f}{result['budget'] * 1000:>12.0f}  {status}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="모듈 import 시간 측정 및 예산 확인")
+    parser.add_argument('modules', nargs='*', help="측정할 모듈 (기본: 예산이 정해진 전체 모듈)")
+    parser.add_argument('--repeat', type=int, default=3, help="모듈마다 반복 횟수 (중앙값 사용)")
+    parser.add_argument('--scale', type=float, default=1.0, help="느린 머신에서 예산에 곱할 배수")
+    parser.add_argument('--output', help="결과 JSON 저장 경로")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    results = run_benchmark(args.modules or list(IMPORT_BUDGETS), repeat=args.repeat, scale=args.scale)
+    print_report(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    sys.exit(0 if all(result['ok'] for result in results) else 1)
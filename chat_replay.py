@@ -0,0 +1,186 @@
+import json
+import time
+import hashlib
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import httpx
+
+CHAT_COMPLETIONS_PATH = '/chat/completions'
+
+
+# 요청 본문 중 응답을 결정하는 부분(model, messages, stream)으로 만든 키
+def request_key(body):
+    key = {'model': body.get('model'), 'messages': body.get('messages'), 'stream': bool(body.get('stream'))}
+    return hashlib.sha1(json.dumps(key, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def load_fixtures(path):
+    fixtures = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                fixtures.append(json.loads(line))
+    return fixtures
+
+
+class RecordingTransport(httpx.BaseTransport):
+    # 실제 API 호출을 그대로 전달하면서 chat completions 요청/응답을 fixture(JSONL)로 저장
+    # 사용 : OpenAI(http_client=httpx.Client(transport=RecordingTransport('fixtures.jsonl')))
+    def __init__(self, path, transport=None):
+        self.path = path
+        self.transport = transport or httpx.HTTPTransport()
+        self._lock = threading.Lock()
+
+    def handle_request(self, request):
+        start = time.perf_counter()
+        response = self.transport.handle_request(request)
+        if not request.url.path.endswith(CHAT_COMPLETIONS_PATH):
+            return response
+
+        content = response.read()
+        fixture = {
+            'key': request_key(json.loads(request.content)),
+            'request': json.loads(request.content),
+            'status': response.status_code,
+            'content_type': response.headers.get('content-type', 'application/json'),
+            'body': content.decode('utf-8'),
+            'latency': time.perf_counter() - start,
+        }
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(fixture, ensure_ascii=False) + '\n')
+
+        # 본문을 이미 읽었으므로 같은 내용으로 새 응답을 만들어 돌려줌
+        return httpx.Response(response.status_code, headers=response.headers, content=content,
+                              request=request)
+
+    def close(self):
+        self.transport.close()
+
+
+def recording_http_client(path):
+    return httpx.Client(transport=RecordingTransport(path))
+
+
+# fixture가 없을 때 돌려줄 응답 생성
+def _completion_body(content, stream):
+    if not stream:
+        return json.dumps({
+            'id': 'replay', 'object': 'chat.completion', 'created': 0, 'model': 'replay',
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content},
+                         'finish_reason': 'stop'}],
+        }, ensure_ascii=False)
+
+    events = []
+    for word in content.split(' '):
+        chunk = {'id': 'replay', 'object': 'chat.completion.chunk', 'created': 0, 'model': 'replay',
+                 'choices': [{'index': 0, 'delta': {'content': word + ' '}, 'finish_reason': None}]}
+        events.append('data: ' + json.dumps(chunk, ensure_ascii=False))
+    events.append('data: [DONE]')
+    return '\n\n'.join(events) + '\n\n'
+
+
+class ReplayServer:
+    # 저장된 fixture를 돌려주는 로컬 chat completions 서버 (지연 시간 주입 가능)
+    # latency : 응답(스트리밍은 첫 조각) 전 대기 시간, chunk_latency : 스트리밍 조각 사이 대기 시간
+    # default_reply : 일치하는 fixture가 없을 때 돌려줄 응답 (None이면 404)
+    def __init__(self, fixtures=(), latency=0.0, chunk_latency=0.0, default_reply=None, host='127.0.0.1', port=0):
+        self.fixtures = {}
+        for fixture in fixtures:
+            self.fixtures.setdefault(fixture['key'], []).append(fixture)
+        self.latency = latency
+        self.chunk_latency = chunk_latency
+        self.default_reply = default_reply
+        self.hits = 0
+        self.misses = 0
+        self._counters = {}
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/v1'
+
+    # 같은 요청이 여러 번 기록된 경우 기록된 순서대로 돌려줌
+    def _lookup(self, body):
+        key = request_key(body)
+        with self._lock:
+            candidates = self.fixtures.get(key)
+            if not candidates:
+                self.misses += 1
+                return None
+            self.hits += 1
+            index = self._counters.get(key, 0)
+            self._counters[key] = index + 1
+            return candidates[index % len(candidates)]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, content_type, body):
+                data = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                if not self.path.endswith(CHAT_COMPLETIONS_PATH):
+                    self._send(404, 'application/json', json.dumps({'error': {'message': 'not found'}}))
+                    return
+
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                stream = bool(body.get('stream'))
+                fixture = server._lookup(body)
+                if fixture is not None:
+                    status, content_type, payload = fixture['status'], fixture['content_type'], fixture['body']
+                elif server.default_reply is not None:
+                    status = 200
+                    content_type = 'text/event-stream' if stream else 'application/json'
+                    payload = _completion_body(server.default_reply, stream)
+                else:
+                    self._send(404, 'application/json',
+                               json.dumps({'error': {'message': 'no recorded fixture for this request'}}))
+                    return
+
+                time.sleep(server.latency)
+                if not (stream and content_type.startswith('text/event-stream')):
+                    self._send(status, content_type, payload)
+                    return
+
+                # 스트리밍 : 저장된 SSE 이벤트를 조각마다 chunk_latency 간격으로 전송
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.end_headers()
+                events = [event for event in payload.split('\n\n') if event.strip()]
+                for i, event in enumerate(events):
+                    if i > 0:
+                        time.sleep(server.chunk_latency)
+                    self.wfile.write((event + '\n\n').encode('utf-8'))
+                    self.wfile.flush()
+                self.close_connection = True
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,144 @@
+import os
+import random
+import asyncio
+import weakref
+import threading
+
+import httpx
+from openai import AsyncOpenAI, APIConnectionError, APITimeoutError, RateLimitError, InternalServerError
+
+from chatbot_logic import MODEL_NAME, SYSTEM_PROMPT, ANALYSIS_PROMPT, DEFAULT_CONTEXT_TOKENS, clean_emotion
+from conversation_context import ConversationContext
+from local_emotion import EmotionTracker
+
+# 다시 시도할 만한 오류 (연결 실패, 타임아웃, 429, 5xx)
+RETRYABLE_ERRORS = (APIConnectionError, APITimeoutError, RateLimitError, InternalServerError)
+
+
+class AsyncChatPool:
+    # 여러 대화 세션이 함께 쓰는 비동기 클라이언트
+    # (HTTP 연결 풀 + 동시 요청 수 제한 + 지수 백오프 재시도)
+    # 하나의 이벤트 루프 안에서 사용
+    def __init__(self, api_key=None, base_url=None, max_connections=100, max_keepalive_connections=20,
+                 max_concurrency=50, timeout=30.0, max_retries=3, backoff_base=0.5, backoff_max=8.0):
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("API Key not found in .env file.")
+
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_keepalive_connections),
+            timeout=timeout)
+        # 재시도는 아래 create에서 직접 처리
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=self.http_client,
+                                  timeout=timeout, max_retries=0)
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    async def create(self, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.semaphore:
+                    return await self.client.chat.completions.create(**kwargs)
+            except RETRYABLE_ERRORS:
+                if attempt == self.max_retries:
+                    raise
+            # 대기 중에는 동시 요청 자리를 비워 둠 (지터 포함)
+            delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+    async def aclose(self):
+        await self.client.close()
+        await self.http_client.aclose()
+
+
+_shared_pools = weakref.WeakKeyDictionary()  # 이벤트 루프 -> AsyncChatPool
+_shared_settings = None
+_shared_lock = threading.Lock()
+
+
+# 프로세스 전체에서 같은 설정의 풀을 공유 (이벤트 루프마다 하나, 코루틴 안에서 호출)
+# httpx 클라이언트와 세마포어는 만든 루프에서만 쓸 수 있으므로 asyncio.run / Streamlit 리런마다 새 루프용 풀을 만듦
+# 설정은 처음 호출할 때의 값으로 고정 (이후 다른 설정을 넘기면 ValueError)
+def get_async_pool(**kwargs):
+    global _shared_settings
+    loop = asyncio.get_running_loop()
+    with _shared_lock:
+        if _shared_settings is not None and kwargs and kwargs != _shared_settings:
+            raise ValueError(f"Async pool already configured with {_shared_settings}, got {kwargs}")
+        pool = _shared_pools.get(loop)
+        if pool is None:
+            settings = kwargs if _shared_settings is None else _shared_settings
+            pool = _shared_pools[loop] = AsyncChatPool(**settings)
+            _shared_settings = settings
+        return pool
+
+
+class AsyncEmotionChatBot:
+    # EmotionChatBot의 비동기 버전 : 세션마다 클라이언트를 만들지 않고 공유 풀을 사용
+    def __init__(self, pool=None, max_context_tokens=DEFAULT_CONTEXT_TOKENS, emotion_analyzer=None):
+        self._pool = pool  # 없으면 호출할 때 현재 이벤트 루프의 공유 풀 사용
+        # 토큰 예산 안에서 대화 기록 관리 (시스템 프롬프트 + 이전 대화 요약 + 최근 대화)
+        self.context = ConversationContext(SYSTEM_PROMPT, max_tokens=max_context_tokens)
+        self.emotion_analyzer = emotion_analyzer  # 로컬 감정 분석기 (없으면 LLM으로만 분석)
+        # 메시지가 올 때마다 백그라운드에서 감정을 누적 분석
+        self.emotion_tracker = EmotionTracker(emotion_analyzer) if emotion_analyzer is not None else None
+        self.user_name = "User" # Default
+
+    @property
+    def pool(self):
+        return self._pool or get_async_pool()
+
+    # API에 보낼 메시지 리스트
+    @property
+    def messages(self):
+        return self.context.messages
+
+    # 현재 프롬프트 크기 (대략적인 토큰 수, 모니터링용)
+    @property
+    def prompt_tokens(self):
+        return self.context.prompt_tokens
+
+    def set_user_name(self, name):
+        self.user_name = name
+
+    async def get_response(self, user_input):
+        self.context.append("user", user_input)
+        if self.emotion_tracker is not None:
+            self.emotion_tracker.update(user_input)
+
+        try:
+            response = await self.pool.create(
+                model=MODEL_NAME,
+                messages=self.messages
+            )
+            assistant_reply = response.choices[0].message.content.strip()
+            self.context.append("assistant", assistant_reply)
+            return assistant_reply
+        except Exception as e:
+            return f"오류가 발생했습니다: {str(e)}"
+
+    async def analyze_emotion(self):
+        # 대화 중 누적해 둔 로컬 분석 결과를 먼저 사용하고, 확신도가 낮을 때만 LLM에 물어봄
+        if self.emotion_tracker is not None:
+            emotion = await asyncio.to_thread(self.emotion_tracker.confident_label)
+            if emotion:
+                return emotion
+        return await self.analyze_emotion_llm()
+
+    async def analyze_emotion_llm(self):
+        # 분석을 위한 임시 메시지 리스트 생성 (시스템 프롬프트 추가)
+        analysis_messages = self.messages + [{"role": "system", "content": ANALYSIS_PROMPT}]
+
+        try:
+            analysis_response = await self.pool.create(
+                model=MODEL_NAME,
+                messages=analysis_messages
+            )
+            # 특수문자 제거
+            return clean_emotion(analysis_response.choices[0].message.content)
+        except Exception as e:
+            print(f"Emotion Analysis Error: {e}")
+            return None
@@ -1,92 +1,162 @@
 import os
-import pandas as pd
+import time
 from dotenv import load_dotenv
 from openai import OpenAI
+from song_catalog import get_catalog
+from conversation_context import ConversationContext
+from local_emotion import EmotionTracker
+from instrumentation import count, record, timed, timer
 
 # .env 파일 로드
 load_dotenv()
 
+MODEL_NAME = "gpt-3.5-turbo"
+DEFAULT_CONTEXT_TOKENS = 2000  # 대화 기록에 쓸 최대 토큰 수 (넘으면 오래된 턴을 요약으로 옮김)
+
+SYSTEM_PROMPT = (
+    "너는 사용자의 이야기를 경청하고 공감해주는 따뜻한 대화 친구야. "
+    "사용자가 어떤 이야기를 하든 친절하고 자연스럽게 대화를 이어가줘. "
+    "대화가 충분히 진행되었거나 사용자가 추천을 원할 때까지는 계속 대화해."
+)
+
+ANALYSIS_PROMPT = (
+    "지금까지의 대화 내용을 바탕으로 사용자의 현재 핵심 감정을 다음 중 하나로만 딱 골라서 대답해줘. "
+    "다른 말은 붙이지 말고 오직 단어 하나만 말해.\n"
+    "목록: [사랑, 즐거움, 열정, 행복, 슬픔, 분노, 외로움, 그리움, 두려움]"
+)
+
+
+# 감정 분석 응답에서 특수문자 제거
+def clean_emotion(emotion):
+    emotion = emotion.strip()
+    for char in ["[", "]", "'", '"', ".", " "]:
+        emotion = emotion.replace(char, "")
+    return emotion
+
+
 class EmotionChatBot:
-    def __init__(self):
-        self.api_key = os.getenv("OPENAI_API_KEY")
-        if not self.api_key:
-            raise ValueError("API Key not found in .env file.")
-        
-        self.client = OpenAI(api_key=self.api_key)
-        self.messages = []
-        self._initialize_system_prompt()
+    def __init__(self, client=None, max_context_tokens=DEFAULT_CONTEXT_TOKENS, emotion_analyzer=None):
+        # client : 테스트 등에서 직접 만든 OpenAI 클라이언트 (예: 로컬 스텁 서버의 base_url)
+        if client is None:
+            self.api_key = os.getenv("OPENAI_API_KEY")
+            if not self.api_key:
+                raise ValueError("API Key not found in .env file.")
+            client = OpenAI(api_key=self.api_key)
+
+        self.client = client
+        # 토큰 예산 안에서 대화 기록 관리 (시스템 프롬프트 + 이전 대화 요약 + 최근 대화)
+        self.context = ConversationContext(SYSTEM_PROMPT, max_tokens=max_context_tokens)
+        # emotion_analyzer : 로컬 감정 분석기 (LocalEmotionAnalyzer), 없으면 LLM으로만 분석
+        self.emotion_analyzer = emotion_analyzer
+        # 메시지가 올 때마다 백그라운드에서 감정을 누적 분석 (추천 요청 시 바로 결과 사용)
+        self.emotion_tracker = EmotionTracker(emotion_analyzer) if emotion_analyzer is not None else None
         self.user_name = "User" # Default
 
-    def _initialize_system_prompt(self):
-        system_content = (
-            "너는 사용자의 이야기를 경청하고 공감해주는 따뜻한 대화 친구야. "
-            "사용자가 어떤 이야기를 하든 친절하고 자연스럽게 대화를 이어가줘. "
-            "대화가 충분히 진행되었거나 사용자가 추천을 원할 때까지는 계속 대화해."
-        )
-        self.messages.append({"role": "system", "content": system_content})
+    # API에 보낼 메시지 리스트
+    @property
+    def messages(self):
+        return self.context.messages
+
+    # 현재 프롬프트 크기 (대략적인 토큰 수, 모니터링용)
+    @property
+    def prompt_tokens(self):
+        return self.context.prompt_tokens
 
     def set_user_name(self, name):
         self.user_name = name
 
+    def _add_user_message(self, user_input):
+        self.context.append("user", user_input)
+        if self.emotion_tracker is not None:
+            self.emotion_tracker.update(user_input)
+
     def get_response(self, user_input):
-        self.messages.append({"role": "user", "content": user_input})
+        self._add_user_message(user_input)
         
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=self.messages
-            )
+            with timer('openai.chat'):
+                response = self.client.chat.completions.create(
+                    model=MODEL_NAME,
+                    messages=self.messages
+                )
             assistant_reply = response.choices[0].message.content.strip()
-            self.messages.append({"role": "assistant", "content": assistant_reply})
+            self.context.append("assistant", assistant_reply)
             return assistant_reply
         except Exception as e:
             return f"오류가 발생했습니다: {str(e)}"
 
+    # 응답을 받는 대로 조각(delta) 단위로 내보내는 제너레이터
+    # 스트림이 끝나면 모인 응답 전체를 대화 기록에 추가
+    def stream_response(self, user_input):
+        self._add_user_message(user_input)
+
+        chunks = []
+        completed = False
+        # 제너레이터라 with 대신 직접 기록 (화면에 그리는 시간도 포함된 전체 스트림 시간)
+        start = time.perf_counter()
+        try:
+            stream = self.client.chat.completions.create(
+                model=MODEL_NAME,
+                messages=self.messages,
+                stream=True
+            )
+            for event in stream:
+                if not event.choices:
+                    continue
+                delta = event.choices[0].delta.content
+                if delta:
+                    if not chunks:
+                        record('openai.first_token', time.perf_counter() - start)
+                    chunks.append(delta)
+                    yield delta
+            completed = True
+        except Exception as e:
+            count('openai.errors')
+            yield f"오류가 발생했습니다: {str(e)}"
+        finally:
+            record('openai.stream', time.perf_counter() - start)
+            # 중간에 읽기를 멈춘 경우에도 받은 만큼은 대화 기록에 남김
+            if completed or chunks:
+                self.context.append("assistant", "".join(chunks).strip())
+
+    @timed('analyze_emotion')
     def analyze_emotion(self):
-        analysis_prompt = (
-            "지금까지의 대화 내용을 바탕으로 사용자의 현재 핵심 감정을 다음 중 하나로만 딱 골라서 대답해줘. "
-            "다른 말은 붙이지 말고 오직 단어 하나만 말해.\n"
-            "목록: [사랑, 즐거움, 열정, 행복, 슬픔, 분노, 외로움, 그리움, 두려움]"
-        )
+        # 대화 중 누적해 둔 로컬 분석 결과를 먼저 사용하고, 확신도가 낮을 때만 LLM에 물어봄
+        if self.emotion_tracker is not None:
+            emotion = self.emotion_tracker.confident_label()
+            if emotion:
+                return emotion
+        return self.analyze_emotion_llm()
+
+    def analyze_emotion_llm(self):
         # 분석을 위한 임시 메시지 리스트 생성 (시스템 프롬프트 추가)
-        analysis_messages = self.messages + [{"role": "system", "content": analysis_prompt}]
+        analysis_messages = self.messages + [{"role": "system", "content": ANALYSIS_PROMPT}]
         
         try:
-            analysis_response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=analysis_messages
-            )
-            emotion = analysis_response.choices[0].message.content.strip()
-            
+            with timer('openai.analysis'):
+                analysis_response = self.client.chat.completions.create(
+                    model=MODEL_NAME,
+                    messages=analysis_messages
+                )
             # 특수문자 제거
-            for char in ["[", "]", "'", '"', ".", " "]:
-                emotion = emotion.replace(char, "")
-                
-            return emotion
+            return clean_emotion(analysis_response.choices[0].message.content)
         except Exception as e:
             print(f"Emotion Analysis Error: {e}")
             return None
 
-def get_songs_by_emotion(emotion, csv_path='data/Final_lyrics_emotion_analysis.csv'):
-    try:
-        if not os.path.exists(csv_path):
-            # 절대 경로로 시도하거나, 상위 디렉토리 확인 등 예외 처리 강화 가능
-            print(f"File not found: {csv_path}")
-            return []
-
-        df = pd.read_csv(csv_path)
-        required_columns = {'emotion1', 'singer', 'title', 'genre'}
-        
-        if not required_columns.issubset(df.columns):
-            print(f"Missing columns. Required: {required_columns}")
-            return []
-
-        # 감정 기준 필터링
-        filtered = df[df['emotion1'].astype(str).str.strip() == emotion]
-        
-        # 결과가 너무 많으면 랜덤으로 5개만 추천하는 등의 로직 추가 가능하지만, 일단 전체 반환
-        return filtered[['singer', 'title', 'genre']].to_dict(orient='records')
+    # 추천 곡 : 대화 중 미리 조회해 둔 목록이 있으면 그대로 사용
+    @timed('recommend_songs')
+    def recommend_songs(self, emotion, limit=6):
+        if self.emotion_tracker is not None:
+            songs = self.emotion_tracker.songs_for(emotion, limit)
+            if songs is not None:
+                return songs
+        # 대화 중 조회와 같은 방식 (감정 비율 벡터가 가까운 곡 순)
+        return get_catalog().nearest_songs(emotion, k=limit)
 
-    except Exception as e:
-        print(f"Error reading CSV: {e}")
-        return []
+@timed('get_songs_by_emotion')
+def get_songs_by_emotion(emotion, csv_path='data/Final_lyrics_emotion_analysis.csv', limit=None, metric='cosine'):
+    # 카탈로그는 한 번만 읽어 두고 감정 비율 벡터가 가까운 곡 순으로 조회 (파일이 바뀌면 다시 읽음)
+    # emotion : 감정 라벨 또는 {감정: 비율}, limit이 없으면 검색 대상 곡 전체
+    catalog = get_catalog(csv_path)
+    return catalog.nearest_songs(emotion, k=limit if limit is not None else len(catalog), metric=metric)
@@ -0,0 +1,212 @@
+import os
+import sys
+import json
+import shutil
+
+import numpy as np
+
+STORE_SUFFIX = '.cols'
+FORMAT_VERSION = 1
+TEXT_COLUMNS = ('lyric',)  # 가사처럼 긴 문자열 : offsets + bytes blob (그 외 문자열 컬럼은 사전 인코딩)
+META_FILE = 'meta.json'
+
+
+# CSV 경로 -> 기본 저장 경로 (data/x.csv -> data/x.cols/)
+def default_store_path(csv_path):
+    return os.path.splitext(csv_path)[0] + STORE_SUFFIX
+
+
+def _source_info(csv_path):
+    stat = os.stat(csv_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+# CSV -> 컬럼별 바이너리 파일 (숫자 : .npy, 문자열 : 사전(codes.npy + values.json), 긴 문자열 : offsets.npy + bytes)
+def build_store(csv_path, store_path=None, text_columns=TEXT_COLUMNS):
+    import pandas as pd
+
+    store_path = store_path or default_store_path(csv_path)
+    source = _source_info(csv_path)
+    df = pd.read_csv(csv_path)
+
+    tmp_path = store_path + '.tmp'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    columns = []
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        prefix = f'c{i}'
+        if name in text_columns:
+            kind = 'text'
+            nulls = series.isna().to_numpy()
+            encoded = [b'' if null else str(value).encode('utf-8') for value, null in zip(series, nulls)]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum([len(value) for value in encoded], out=offsets[1:])
+            np.save(os.path.join(tmp_path, prefix + '.offsets.npy'), offsets)
+            np.save(os.path.join(tmp_path, prefix + '.nulls.npy'), nulls)
+            with open(os.path.join(tmp_path, prefix + '.bytes'), 'wb') as f:
+                f.write(b''.join(encoded))
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            kind = 'numeric'
+            np.save(os.path.join(tmp_path, prefix + '.values.npy'), series.to_numpy())
+        else:
+            kind = 'dict'
+            # 처음 나온 순서대로 값 번호를 매김 (빈 값은 -1)
+            codes, values = pd.factorize(series)
+            np.save(os.path.join(tmp_path, prefix + '.codes.npy'), codes.astype(np.int32))
+            with open(os.path.join(tmp_path, prefix + '.values.json'), 'w', encoding='utf-8') as f:
+                json.dump([str(value) for value in values], f, ensure_ascii=False)
+        columns.append({'name': name, 'kind': kind, 'prefix': prefix})
+
+    with open(os.path.join(tmp_path, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'version': FORMAT_VERSION, 'rows': len(df), 'columns': columns,
+                   'source': source}, f, ensure_ascii=False, indent=2)
+
+    shutil.rmtree(store_path, ignore_errors=True)
+    os.replace(tmp_path, store_path)
+    return store_path
+
+
+class DictColumn:
+    # 사전 인코딩 컬럼 : 행별 값 번호(codes) + 값 목록
+    def __init__(self, codes, values):
+        self.codes = codes
+        self.values = values
+        self._lookup = np.array(list(values) + [None], dtype=object)  # -1(빈 값) -> None
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        return self._lookup[self.codes[i]]
+
+    def to_numpy(self, start=0, stop=None):
+        return self._lookup[self.codes[start:stop]]
+
+    # 값이 value인 행 번호들 (CSV 전체를 읽지 않고 필터링)
+    def rows_with(self, value):
+        if value not in self.values:
+            return np.zeros(0, dtype=np.int64)
+        return np.flatnonzero(np.asarray(self.codes) == self.values.index(value))
+
+
+class TextColumn:
+    # 긴 문자열 컬럼 : i번째 값 = blob[offsets[i]:offsets[i + 1]] (blob은 mmap, 읽는 행만 페이지에 올라옴)
+    def __init__(self, offsets, blob, nulls):
+        self.offsets = offsets
+        self.blob = blob
+        self.nulls = nulls
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if self.nulls[i]:
+            return None
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode('utf-8')
+
+    def to_numpy(self, start=0, stop=None):
+        stop = len(self) if stop is None else min(stop, len(self))
+        return np.array([self[i] for i in range(start, stop)], dtype=object)
+
+
+class ColumnStore:
+    # build_store로 만든 저장소 읽기 (컬럼은 처음 접근할 때 mmap으로 엶)
+    def __init__(self, store_path):
+        self.store_path = store_path
+        with open(os.path.join(store_path, META_FILE), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta['version'] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported store version: {self.meta['version']}")
+        self.specs = {column['name']: column for column in self.meta['columns']}
+        self._columns = {}
+
+    @property
+    def names(self):
+        return list(self.specs)
+
+    def __len__(self):
+        return self.meta['rows']
+
+    def _path(self, spec, suffix):
+        return os.path.join(self.store_path, spec['prefix'] + suffix)
+
+    def column(self, name):
+        if name not in self._columns:
+            spec = self.specs[name]
+            if spec['kind'] == 'text':
+                offsets = np.load(self._path(spec, '.offsets.npy'), mmap_mode='r')
+                size = os.path.getsize(self._path(spec, '.bytes'))
+                # 빈 파일은 mmap 할 수 없음
+                blob = np.memmap(self._path(spec, '.bytes'), dtype=np.uint8, mode='r') if size else b''
+                column = TextColumn(offsets, blob, np.load(self._path(spec, '.nulls.npy'), mmap_mode='r'))
+            elif spec['kind'] == 'dict':
+                with open(self._path(spec, '.values.json'), 'r', encoding='utf-8') as f:
+                    values = json.load(f)
+                column = DictColumn(np.load(self._path(spec, '.codes.npy'), mmap_mode='r'), values)
+            else:
+                column = np.load(self._path(spec, '.values.npy'), mmap_mode='r')
+            self._columns[name] = column
+        return self._columns[name]
+
+    # CSV를 만들 때 쓴 파일이 그대로인지 (크기, 수정 시간)
+    def is_fresh(self, csv_path):
+        try:
+            return _source_info(csv_path) == self.meta['source']
+        except OSError:
+            return False
+
+    # 필요한 컬럼, 필요한 행 범위만 DataFrame으로
+    def to_frame(self, columns=None, start=0, stop=None):
+        import pandas as pd
+
+        stop = len(self) if stop is None else min(stop, len(self))
+        data = {}
+        for name in columns or self.names:
+            column = self.column(name)
+            if isinstance(column, np.ndarray):
+                data[name] = np.array(column[start:stop])
+            else:
+                data[name] = column.to_numpy(start, stop)
+        return pd.DataFrame(data, columns=columns or self.names, index=pd.RangeIndex(start, stop))
+
+    def iter_frames(self, columns=None, chunksize=2000):
+        for start in range(0, len(self), chunksize):
+            yield self.to_frame(columns, start, start + chunksize)
+
+
+# CSV 옆에 최신 저장소가 있으면 열어서 반환 (없거나 CSV가 바뀌었으면 None)
+def open_store(csv_path, store_path=None):
+    store_path = store_path or default_store_path(csv_path)
+    if not os.path.exists(os.path.join(store_path, META_FILE)):
+        return None
+    try:
+        store = ColumnStore(store_path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Column store unavailable ({store_path}): {e}")
+        return None
+    return store if store.is_fresh(csv_path) else None
+
+
+# 저장소가 있으면 저장소에서, 없으면 CSV에서 읽음
+def read_table(csv_path, columns=None):
+    store = open_store(csv_path)
+    if store is not None:
+        return store.to_frame(columns)
+    import pandas as pd
+    return pd.read_csv(csv_path, usecols=columns)
+
+
+def iter_table(csv_path, columns=None, chunksize=2000):
+    store = open_store(csv_path)
+    if store is not None:
+        return store.iter_frames(columns, chunksize)
+    import pandas as pd
+    return pd.read_csv(csv_path, usecols=columns, chunksize=chunksize)
+
+
+if __name__ == '__main__':
+    # 사용 : python columnar_store.py data/Sub_data/preprocessed_data.csv data/Final_lyrics_emotion_analysis.csv
+    for path in sys.argv[1:]:
+        print(f"{path} -> {build_store(path)}")
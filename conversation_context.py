@@ -0,0 +1,87 @@
+import re
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken이 없으면 근사치 사용
+    _encoding = None
+
+MESSAGE_OVERHEAD = 4  # 메시지마다 붙는 role/구분자 토큰 (대략)
+_HANGUL = re.compile('[가-힣ㄱ-ㅎㅏ-ㅣ]')
+
+
+# 대략적인 토큰 수 (한글 1자 ≈ 1토큰, 그 외 4자 ≈ 1토큰)
+def estimate_tokens(text):
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    hangul = len(_HANGUL.findall(text))
+    return hangul + (len(text) - hangul + 3) // 4
+
+
+# 기본 요약 : 밀려난 사용자 발화의 앞부분만 이어 붙임 (추가 API 호출 없음)
+def extractive_summary(summary, dropped_messages):
+    lines = [summary] if summary else []
+    for message in dropped_messages:
+        if message["role"] == "user":
+            lines.append("- " + message["content"][:80])
+    return "\n".join(lines)
+
+
+# 요약이 max_tokens를 넘으면 오래된 줄부터 버림
+def trim_summary(summary, max_tokens):
+    lines = summary.split("\n")
+    while len(lines) > 1 and estimate_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    summary = "\n".join(lines)
+    while summary and estimate_tokens(summary) > max_tokens:
+        summary = summary[len(summary) // 4 + 1:]
+    return summary
+
+
+class ConversationContext:
+    # 토큰 예산 안에서 대화 기록 관리
+    # (시스템 프롬프트 + 오래된 대화 요약 + 최근 대화, 예산을 넘으면 오래된 턴부터 요약으로 옮김)
+    def __init__(self, system_prompt, max_tokens=2000, keep_recent=4, summarizer=None, summary_share=0.25):
+        self.system_message = {"role": "system", "content": system_prompt}
+        self.max_tokens = max_tokens
+        self.summary_tokens = int(max_tokens * summary_share)  # 요약에 쓸 수 있는 최대 토큰 수
+        self.keep_recent = keep_recent  # 예산을 넘어도 항상 남겨 둘 최근 메시지 수
+        self.summarizer = summarizer or extractive_summary
+        self.summary = ""
+        self.turns = []  # [(message, token 수)]
+        self.dropped_turns = 0
+
+    def _summary_message(self):
+        return {"role": "system", "content": "이전 대화 요약 (사용자 발화):\n" + self.summary}
+
+    @property
+    def messages(self):
+        messages = [self.system_message]
+        if self.summary:
+            messages.append(self._summary_message())
+        messages.extend(message for message, _ in self.turns)
+        return messages
+
+    # 현재 프롬프트 크기 (모니터링용)
+    @property
+    def prompt_tokens(self):
+        total = estimate_tokens(self.system_message["content"]) + MESSAGE_OVERHEAD
+        if self.summary:
+            total += estimate_tokens(self._summary_message()["content"]) + MESSAGE_OVERHEAD
+        return total + sum(tokens for _, tokens in self.turns)
+
+    def append(self, role, content):
+        message = {"role": role, "content": content}
+        self.turns.append((message, estimate_tokens(content) + MESSAGE_OVERHEAD))
+        self._enforce_budget()
+
+    def _enforce_budget(self):
+        dropped = []
+        while self.prompt_tokens > self.max_tokens and len(self.turns) > self.keep_recent:
+            message, _ = self.turns.pop(0)
+            dropped.append(message)
+        if dropped:
+            # 밀려난 턴은 요약으로 옮김 (summarizer(이전 요약, 밀려난 메시지들) -> 새 요약)
+            self.summary = trim_summary(self.summarizer(self.summary, dropped), self.summary_tokens)
+            self.dropped_turns += len(dropped)
+        return dropped
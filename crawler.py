@@ -0,0 +1,428 @@
+import os
+import sys
+import json
+import time
+import queue
+import hashlib
+import argparse
+import threading
+from html.parser import HTMLParser
+from urllib.parse import quote_plus
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+# 네이버 곡정보 검색 URL (CRAWLING.ipynb와 같은 형식)
+SEARCH_URL = ('https://search.naver.com/search.naver?sm=tab_hty.top&where=nexearch&ssc=tab.nx.all'
+              '&query={}+{}+%EA%B3%A1%EC%A0%95%EB%B3%B4&oquery={}+%EA%B3%A1%EC%A0%95%EB%B3%B4'
+              '&tqi=juVnQsqVN8wssvMPvflssssstDG-260394&ackey=cb7tpj47')
+INFO_BOX_CLASS = 'cm_info_box'
+GENRE_KEYWORD = '장르'
+PAGE_LOAD_TIMEOUT = 15
+WAIT_TIMEOUT = 5  # 곡정보 카드가 나타나기를 기다리는 최대 시간 (고정 sleep 대신)
+HTTP_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                              '(KHTML, like Gecko) Chrome/120.0 Safari/537.36'}
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# 닫는 태그가 없는 HTML 요소
+VOID_TAGS = frozenset(('area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param',
+                       'source', 'track', 'wbr'))
+# parse_song_page 확인용 HTML 조각 : (설명, HTML, 기대 결과)
+PARSER_FIXTURES = [
+    ('card with genre',
+     '<div class="cm_info_box"><dl><div><dt>앨범</dt><dd>X</dd></div><div><dt>장르</dt><dd>발라드<br>댄스</dd></div>'
+     '</dl><img src="a.png"></div>',
+     (True, '발라드')),
+    ('no card',
+     '<div class="news"><p>장르</p><p>뉴스 기사 제목</p></div>',
+     (False, None)),
+    ('void source inside card',
+     '<div class="cm_info_box"><picture><source srcset="a.webp"><img src="a.png"></picture></div>'
+     '<p>장르</p><p>뉴스 기사 제목</p>',
+     (False, None)),
+    ('implied end tags inside card',
+     '<div class="cm_info_box"><dl><dt>장르<dd>발라드</dl><ul><li>a<li>b</ul></div><p>장르</p><p>뉴스 기사 제목</p>',
+     (True, '발라드')),
+]
+
+
+def song_url(singer, title):
+    return SEARCH_URL.format(quote_plus(str(singer)), quote_plus(str(title)), quote_plus(str(title)))
+
+
+# 곡정보 카드 텍스트 -> '장르' 다음 줄 (없으면 None)
+def genre_from_text(text):
+    lines = text.split('\n')
+    for i, line in enumerate(lines):
+        if GENRE_KEYWORD in line and i + 1 < len(lines):
+            return lines[i + 1].strip()
+    return None
+
+
+# 카드 텍스트 목록 -> (곡정보 카드 여부, 장르)
+def inspect_info_boxes(texts):
+    for text in texts:
+        if GENRE_KEYWORD in text:
+            return True, genre_from_text(text)
+    return False, None
+
+
+def default_driver_factory():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    driver = webdriver.Chrome(options=options)
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+    return driver
+
+
+class DriverPool:
+    # 오래 쓰는 headless Chrome 드라이버 묶음 (URL마다 새로 띄우지 않음)
+    # 드라이버는 처음 필요할 때 만들고, 오류가 난 드라이버는 버린 뒤 그 자리(None)에 다음에 새로 만듦
+    def __init__(self, size=4, driver_factory=default_driver_factory):
+        self.size = size
+        self.driver_factory = driver_factory
+        self.idle = queue.Queue()
+        self.created = 0  # 만든 자리 수 (살아 있는 드라이버 + 버려진 자리)
+        self.drivers = []
+        self._lock = threading.Lock()
+
+    def _create(self):
+        try:
+            driver = self.driver_factory()
+        except Exception:
+            # 자리를 돌려놓아 기다리는 스레드가 다시 시도할 수 있게 함
+            self.idle.put(None)
+            raise
+        with self._lock:
+            self.drivers.append(driver)
+        return driver
+
+    def acquire(self):
+        with self._lock:
+            create = self.idle.empty() and self.created < self.size
+            if create:
+                self.created += 1
+        driver = None if create else self.idle.get()
+        return driver if driver is not None else self._create()
+
+    def release(self, driver, broken=False):
+        if not broken:
+            self.idle.put(driver)
+            return
+        with self._lock:
+            if driver in self.drivers:
+                self.drivers.remove(driver)
+        self._quit(driver)
+        self.idle.put(None)
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"드라이버 종료 실패: {e}")
+
+    def close(self):
+        with self._lock:
+            drivers, self.drivers = self.drivers, []
+            self.created = 0
+            self.idle = queue.Queue()
+        for driver in drivers:
+            self._quit(driver)
+
+
+class BrowserBackend:
+    # Selenium으로 페이지를 한 번 열어 곡정보 카드 여부와 장르를 함께 확인
+    def __init__(self, pool_size=4, wait_timeout=WAIT_TIMEOUT, driver_factory=default_driver_factory):
+        self.pool = DriverPool(pool_size, driver_factory)
+        self.wait_timeout = wait_timeout
+
+    def inspect(self, url):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.common.exceptions import TimeoutException, WebDriverException
+
+        driver = self.pool.acquire()
+        broken = False
+        try:
+            driver.get(url)
+            try:
+                WebDriverWait(driver, self.wait_timeout).until(
+                    EC.presence_of_element_located((By.CLASS_NAME, INFO_BOX_CLASS)))
+            except TimeoutException:
+                # 곡정보 카드가 없는 페이지
+                return False, None
+            return inspect_info_boxes([box.text for box in driver.find_elements(By.CLASS_NAME, INFO_BOX_CLASS)])
+        except WebDriverException:
+            # 페이지 로드 타임아웃이나 브라우저 오류 : 이 드라이버는 버림
+            broken = True
+            raise
+        finally:
+            self.pool.release(driver, broken=broken)
+
+    def close(self):
+        self.pool.close()
+
+
+class InfoBoxParser(HTMLParser):
+    # HTML에서 곡정보 카드(class에 cm_info_box가 있는 요소)별 텍스트 줄 수집 (브라우저의 box.text와 같은 형태)
+    def __init__(self):
+        super().__init__()
+        self.boxes = []
+        self._stack = []  # 열린 태그별 (태그 이름, 카드 시작 여부)
+        self._depth = 0  # 현재 열려 있는 카드 수
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            return
+        is_box = INFO_BOX_CLASS in (dict(attrs).get('class') or '').split()
+        if is_box and self._depth == 0:
+            self.boxes.append([])
+        self._stack.append((tag, is_box))
+        self._depth += is_box
+
+    def handle_endtag(self, tag):
+        # 닫는 태그와 같은 이름의 태그까지 모두 닫음 (생략된 </p>, </li>, </dd> 처리)
+        # 열린 적 없는 태그의 닫는 태그는 무시
+        if tag in VOID_TAGS or all(name != tag for name, _ in self._stack):
+            return
+        while True:
+            name, is_box = self._stack.pop()
+            self._depth -= is_box
+            if name == tag:
+                break
+
+    def handle_data(self, data):
+        if self._depth > 0 and data.strip():
+            self.boxes[-1].append(data.strip())
+
+
+# 페이지 HTML -> (곡정보 카드 여부, 장르)
+def parse_song_page(html):
+    parser = InfoBoxParser()
+    parser.feed(html)
+    parser.close()
+    return inspect_info_boxes(['\n'.join(lines) for lines in parser.boxes])
+
+
+# PARSER_FIXTURES 결과가 기대와 다른 항목 목록
+def check_parser(fixtures=PARSER_FIXTURES):
+    failures = []
+    for name, html, expected in fixtures:
+        result = parse_song_page(html)
+        if result != expected:
+            failures.append(f"{name}: expected {expected}, got {result}")
+    return failures
+
+
+class RateLimiter:
+    # 초당 rate개 요청 (토큰 버킷, 최대 burst개까지 몰아서 허용)
+    def __init__(self, rate=5.0, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class ResponseCache:
+    # URL별 응답 HTML을 파일로 저장 (다시 실행하면 네트워크 없이 파싱만)
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def _path(self, url):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], key + '.html')
+
+    def get(self, url):
+        path = self._path(url)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def put(self, url, html):
+        path = self._path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(html)
+        os.replace(tmp_path, path)
+
+
+class ProgressJournal:
+    # 확인을 마친 곡 기록 (JSONL, 한 줄에 한 곡) : 중단된 실행을 이어서 할 때 이미 끝난 곡은 건너뜀
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self):
+        done = {}
+        if not os.path.exists(self.path):
+            return done
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # 중단되며 잘린 마지막 줄
+                    continue
+                done[(entry['singer'], entry['title'])] = (entry['valid'], entry['genre'])
+        return done
+
+    def record(self, song, valid, genre):
+        line = json.dumps({'singer': song[0], 'title': song[1], 'valid': valid, 'genre': genre},
+                          ensure_ascii=False)
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+
+class HttpBackend:
+    # 브라우저 없이 HTML만 받아 곡정보 카드를 파싱 (keep-alive 연결 풀 + 초당 요청 수 제한 + 응답 캐시)
+    def __init__(self, cache_dir=None, max_connections=8, rate=5.0, timeout=PAGE_LOAD_TIMEOUT, max_retries=2,
+                 backoff_base=1.0, headers=HTTP_HEADERS):
+        import httpx
+
+        self.client = httpx.Client(
+            headers=headers, timeout=timeout, follow_redirects=True,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections))
+        self.limiter = RateLimiter(rate)
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.transport_errors = (httpx.TransportError,)
+
+    def fetch(self, url):
+        if self.cache is not None:
+            html = self.cache.get(url)
+            if html is not None:
+                return html
+
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            try:
+                response = self.client.get(url)
+                if response.status_code not in RETRY_STATUS:
+                    response.raise_for_status()
+                    break
+                error = RuntimeError(f"HTTP {response.status_code}")
+            except self.transport_errors as e:
+                error = e
+            if attempt == self.max_retries:
+                raise error
+            time.sleep(self.backoff_base * (2 ** attempt))
+
+        html = response.text
+        if self.cache is not None:
+            self.cache.put(url, html)
+        return html
+
+    def inspect(self, url):
+        return parse_song_page(self.fetch(url))
+
+    def close(self):
+        self.client.close()
+
+
+# 곡 목록 -> 곡별 (곡정보 카드 여부, 장르) (workers개 페이지를 동시에 확인, 입력 순서 유지)
+# journal(ProgressJournal)이 주어지면 이미 기록된 곡은 건너뛰고, 새로 확인한 곡은 바로 기록
+def crawl_songs(songs, backend, workers=4, url_builder=song_url, journal=None):
+    songs = list(songs)
+    results = journal.load() if journal is not None else {}
+    todo = [song for song in dict.fromkeys(songs) if song not in results]
+    if results:
+        print(f"이전 실행에서 {len(songs) - len(todo)}곡 완료, {len(todo)}곡 남음")
+
+    def inspect(i):
+        singer, title = todo[i]
+        url = url_builder(singer, title)
+        try:
+            valid, genre = backend.inspect(url)
+        except Exception as e:
+            # 오류가 난 곡은 기록하지 않음 (다음 실행에서 다시 확인)
+            print(f"[오류] {url}\n{e}")
+            return False, None
+        if journal is not None:
+            journal.record(todo[i], valid, genre)
+        print(f"[{i + 1}/{len(todo)}] {singer} - {title} : {genre if valid else '곡정보 없음'}")
+        return valid, genre
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results.update(zip(todo, executor.map(inspect, range(len(todo)))))
+    return {song: results[song] for song in songs}
+
+
+# 곡정보가 있는 곡만 남기고 장르 컬럼 추가 ((singer, title) 키로 한 번에 조인)
+def build_crawling_data(df, results):
+    genres = {song: genre for song, (valid, genre) in results.items() if valid}
+    keys = list(zip(df['singer'], df['title']))
+    keep = [key in genres for key in keys]
+    crawled = df.loc[keep, ['singer', 'title', 'lyric']].copy()
+    crawled['genre'] = [genres[key] for key, kept in zip(keys, keep) if kept]
+    return crawled.reset_index(drop=True)
+
+
+def run_crawler(input_path, output_path, backend, workers=4, url_builder=song_url, journal_path=None):
+    df = pd.read_csv(input_path, encoding='utf-8')
+    songs = list(dict.fromkeys(zip(df['singer'], df['title'])))
+    journal = ProgressJournal(journal_path) if journal_path else None
+    try:
+        results = crawl_songs(songs, backend, workers=workers, url_builder=url_builder, journal=journal)
+    finally:
+        backend.close()
+
+    crawled = build_crawling_data(df, results)
+    crawled.to_csv(output_path, index=False, encoding='utf-8-sig')
+    print(f"전체 {len(songs)}곡 중 {len(crawled)}곡 저장: {output_path}")
+    return crawled
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="네이버 곡정보(장르) 크롤링")
+    parser.add_argument('--input', default='data/Sub_data/preprocessed_data.csv')
+    parser.add_argument('--output', default='data/Sub_data/crawling_data.csv')
+    parser.add_argument('--backend', choices=['http', 'browser'], default='http',
+                        help="http : HTML만 받아 파싱 (빠름), browser : Selenium Chrome")
+    parser.add_argument('--workers', type=int, default=4, help="동시에 확인하는 페이지 수")
+    parser.add_argument('--wait-timeout', type=float, default=WAIT_TIMEOUT, help="곡정보 카드 대기 시간 (초, browser)")
+    parser.add_argument('--rate', type=float, default=5.0, help="초당 최대 요청 수 (http)")
+    parser.add_argument('--cache-dir', default=os.path.join('cache', 'crawl_pages'), help="응답 캐시 폴더 (http)")
+    parser.add_argument('--journal', default=os.path.join('cache', 'crawl_journal.jsonl'),
+                        help="진행 기록 파일 (중단 후 다시 실행하면 이어서 진행)")
+    parser.add_argument('--check-parser', action='store_true', help="HTML 파서를 내장 예제로 확인만 하고 종료")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.check_parser:
+        failures = check_parser()
+        for failure in failures:
+            print(f"FAIL {failure}")
+        print(f"{len(PARSER_FIXTURES) - len(failures)}/{len(PARSER_FIXTURES)} parser fixtures passed")
+        sys.exit(1 if failures else 0)
+    if args.backend == 'http':
+        backend = HttpBackend(args.cache_dir, max_connections=args.workers, rate=args.rate)
+    else:
+        backend = BrowserBackend(args.workers, args.wait_timeout)
+    run_crawler(args.input, args.output, backend, workers=args.workers, journal_path=args.journal)
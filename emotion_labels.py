@@ -0,0 +1,35 @@
+# vocab 컬럼(감정 코드) : 감정
+EMOTION_CODES = {
+    'love': '5359',  # 사랑
+    'fun': '5370',  # 즐거움
+    'enthusiasm': '5361',  # 열정
+    'happyness': '5363',  # 행복
+    'sadness': '5364',  # 슬픔
+    'anger': '5365',  # 분노
+    'lonely': '5366',  # 외로움
+    'longing': '5367',  # 그리움
+    'fear': '5368',  # 두려움
+}
+
+# 감정 코드 : 추천에 쓰는 한국어 감정 라벨
+EMOTION_LABELS = {
+    '5359': '사랑',
+    '5370': '즐거움',
+    '5361': '열정',
+    '5363': '행복',
+    '5364': '슬픔',
+    '5365': '분노',
+    '5366': '외로움',
+    '5367': '그리움',
+    '5368': '두려움',
+}
+
+POSITIVE_EMOTIONS = [EMOTION_CODES[e] for e in ('love', 'fun', 'enthusiasm', 'happyness')]
+NEGATIVE_EMOTIONS = [EMOTION_CODES[e] for e in ('sadness', 'anger', 'lonely', 'longing', 'fear')]
+
+
+# 감정 코드 -> 한국어 라벨 (CSV에서 숫자로 읽힌 코드도 처리, 없는 값은 그대로)
+def to_korean_label(code):
+    if isinstance(code, float) and code.is_integer():
+        code = int(code)
+    return EMOTION_LABELS.get(str(code), code)
@@ -0,0 +1,111 @@
+import numpy as np
+
+METRICS = ('cosine', 'kl')
+SMOOTHING = 1e-3  # KL 계산 시 0 비율을 피하기 위해 더하는 값
+PARTITION_MIN_ROWS = 5000  # 이보다 곡이 많을 때만 분할 인덱스 사용 (n_partitions='auto')
+
+
+# 행마다 합이 1인 분포로 (합이 0인 행은 균등 분포)
+def to_distributions(vectors):
+    vectors = np.clip(np.asarray(vectors, dtype=np.float32), 0, None)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    totals = vectors.sum(axis=1, keepdims=True)
+    uniform = np.full_like(vectors, 1.0 / max(vectors.shape[1], 1))
+    return np.where(totals > 0, vectors / np.where(totals > 0, totals, 1), uniform)
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1)
+
+
+def _smooth(distributions):
+    smoothed = distributions + SMOOTHING
+    return smoothed / smoothed.sum(axis=1, keepdims=True)
+
+
+# 질의 분포(q개) x 곡 분포(n개) 거리 행렬
+# cosine : 1 - 코사인 유사도, kl : KL(질의 || 곡)
+def pairwise_distance(queries, vectors, metric='cosine'):
+    if metric == 'cosine':
+        return 1.0 - _normalize(queries) @ _normalize(vectors).T
+    if metric == 'kl':
+        p, q = _smooth(queries), _smooth(vectors)
+        return (p * np.log(p)).sum(axis=1, keepdims=True) - p @ np.log(q).T
+    raise ValueError(f"Unknown metric: {metric} (choose from {METRICS})")
+
+
+# 거리가 가까운 k개 (가까운 순, 같은 거리는 행 번호 순)
+def top_k(distances, k):
+    k = min(k, distances.shape[1])
+    if k <= 0:
+        return np.zeros((distances.shape[0], 0), dtype=np.int64)
+    if k < distances.shape[1]:
+        candidates = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.tile(np.arange(distances.shape[1]), (distances.shape[0], 1))
+    candidates = np.sort(candidates, axis=1)
+    order = np.argsort(np.take_along_axis(distances, candidates, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+# 간단한 k-means (분할 인덱스의 중심 계산용, seed 고정)
+def kmeans(vectors, n_clusters, metric='cosine', iterations=10, seed=0):
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)]
+    for _ in range(iterations):
+        assignment = pairwise_distance(vectors, centroids, metric).argmin(axis=1)
+        for c in range(n_clusters):
+            members = vectors[assignment == c]
+            if len(members):
+                centroids[c] = members.mean(axis=0)
+    return centroids, pairwise_distance(vectors, centroids, metric).argmin(axis=1)
+
+
+class EmotionIndex:
+    # 곡별 감정 비율 벡터(곡 수 x 감정 수)를 메모리에 두고 가까운 곡 검색
+    # n_partitions : 분할 인덱스 크기 (None이면 전체 탐색, 'auto'면 곡이 많을 때만 sqrt(곡 수)개)
+    # n_probe : 분할 인덱스 사용 시 질의마다 살펴볼 가까운 분할 수
+    def __init__(self, vectors, metric='cosine', n_partitions='auto', n_probe=8):
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric} (choose from {METRICS})")
+        self.metric = metric
+        self.vectors = to_distributions(vectors) if len(vectors) else np.zeros((0, np.shape(vectors)[-1]), np.float32)
+        if n_partitions == 'auto':
+            n_partitions = int(np.sqrt(len(self.vectors))) if len(self.vectors) >= PARTITION_MIN_ROWS else None
+        self.n_probe = n_probe
+        self.centroids = None
+        self.partitions = None
+        if n_partitions and len(self.vectors) > n_partitions:
+            self.centroids, assignment = kmeans(self.vectors, n_partitions, metric)
+            self.partitions = [np.flatnonzero(assignment == c) for c in range(n_partitions)]
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def query(self, distribution, k=10):
+        indices, distances = self.query_batch([distribution], k)
+        return indices[0], distances[0]
+
+    # 여러 질의를 한 번에 검색 -> (질의별 행 번호 리스트, 질의별 거리 리스트)
+    def query_batch(self, distributions, k=10):
+        queries = to_distributions(distributions)
+        if len(self.vectors) == 0:
+            return [[] for _ in queries], [[] for _ in queries]
+        if self.partitions is None:
+            distances = pairwise_distance(queries, self.vectors, self.metric)
+            nearest = top_k(distances, k)
+            return ([row.tolist() for row in nearest],
+                    [d.tolist() for d in np.take_along_axis(distances, nearest, axis=1)])
+
+        # 분할 인덱스 : 가까운 분할 n_probe개 안에서만 거리 계산
+        probes = top_k(pairwise_distance(queries, self.centroids, self.metric), self.n_probe)
+        indices, distances = [], []
+        for query, probe in zip(queries, probes):
+            candidates = np.sort(np.concatenate([self.partitions[c] for c in probe]))
+            candidate_distances = pairwise_distance(query[None, :], self.vectors[candidates], self.metric)
+            nearest = top_k(candidate_distances, k)[0]
+            indices.append(candidates[nearest].tolist())
+            distances.append(candidate_distances[0, nearest].tolist())
+        return indices, distances
@@ -0,0 +1,292 @@
+import os
+import sys
+import time
+import functools
+import threading
+from collections import Counter
+
+# 단계별 타이머/카운터 (기본 꺼짐, 꺼져 있으면 timer()는 아무것도 하지 않는 공용 객체를 반환)
+# 환경 변수로 켜면 spawn으로 만든 분석 워커 프로세스도 같이 켜짐
+ENV_VAR = 'LYRICS_INSTRUMENT'
+METRIC_PREFIX = 'lyrics'
+PROFILE_INTERVAL = 0.005  # 샘플링 프로파일러 간격 (초)
+_INTERNAL_THREADS = ('instrumentation-report', 'sampling-profiler')
+
+_enabled = os.getenv(ENV_VAR, '') not in ('', '0')
+_lock = threading.Lock()
+_timers = {}  # 이름 -> [호출 수, 총 시간, 최대 시간]
+_counters = {}
+_remote = {}  # 다른 프로세스(분석 워커)의 누적 결과 : pid -> snapshot
+
+
+def enabled():
+    return _enabled
+
+
+def enable(propagate=True):
+    global _enabled
+    _enabled = True
+    if propagate:
+        os.environ[ENV_VAR] = '1'
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    os.environ.pop(ENV_VAR, None)
+
+
+def record(name, seconds):
+    if not _enabled:
+        return
+    with _lock:
+        stats = _timers.get(name)
+        if stats is None:
+            _timers[name] = [1, seconds, seconds]
+        else:
+            stats[0] += 1
+            stats[1] += seconds
+            if seconds > stats[2]:
+                stats[2] = seconds
+
+
+def count(name, value=1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+class _Timer:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+# with timer('komoran'): ...
+def timer(name):
+    return _Timer(name) if _enabled else _NULL_TIMER
+
+
+# 함수 전체 시간 측정 데코레이터 (꺼져 있으면 원래 함수를 바로 호출)
+def timed(name):
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Timer(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _local_snapshot():
+    with _lock:
+        return {'timers': {name: {'calls': calls, 'seconds': seconds, 'max_seconds': longest}
+                           for name, (calls, seconds, longest) in _timers.items()},
+                'counters': dict(_counters)}
+
+
+# 여러 snapshot 합산 (호출 수/시간/카운터는 더하고 최대 시간은 최댓값)
+def merge(snapshots):
+    timers, counters = {}, Counter()
+    for snap in snapshots:
+        for name, stats in snap.get('timers', {}).items():
+            total = timers.setdefault(name, {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+            total['calls'] += stats['calls']
+            total['seconds'] += stats['seconds']
+            total['max_seconds'] = max(total['max_seconds'], stats['max_seconds'])
+        counters.update(snap.get('counters', {}))
+    return {'timers': timers, 'counters': dict(counters)}
+
+
+# 이 프로세스 + update_remote로 받은 워커 프로세스 결과
+def snapshot():
+    with _lock:
+        remote = list(_remote.values())
+    return merge([_local_snapshot()] + remote)
+
+
+# 워커가 보낸 누적 snapshot 저장 (같은 pid는 최신 값으로 교체)
+def update_remote(pid, snap):
+    if pid == os.getpid():
+        return
+    with _lock:
+        _remote[pid] = snap
+
+
+def reset():
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+        _remote.clear()
+
+
+# 시간 순 표 (단계는 서로 포함될 수 있으므로 합이 전체 시간과 같지 않음)
+def format_summary(snap=None):
+    snap = snap or snapshot()
+    lines = [f"{'stage':<28}{'calls':>10}{'total(s)':>12}{'mean(ms)':>12}{'max(ms)':>12}"]
+    for name, stats in sorted(snap['timers'].items(), key=lambda item: -item[1]['seconds']):
+        mean = stats['seconds'] / stats['calls'] if stats['calls'] else 0.0
+        lines.append(f"{name:<28}{stats['calls']:>10}{stats['seconds']:>12.3f}{mean * 1000:>12.2f}"
+                     f"{stats['max_seconds'] * 1000:>12.2f}")
+    for name, value in sorted(snap['counters'].items()):
+        lines.append(f"{name:<28}{value:>10}")
+    return "\n".join(lines)
+
+
+# Prometheus text exposition 형식
+def prometheus_text(snap=None, prefix=METRIC_PREFIX):
+    snap = snap or snapshot()
+    metrics = [
+        ('stage_calls_total', 'counter', 'Number of times each stage ran', 'calls'),
+        ('stage_seconds_total', 'counter', 'Total seconds spent in each stage', 'seconds'),
+        ('stage_max_seconds', 'gauge', 'Longest single run of each stage', 'max_seconds'),
+    ]
+    lines = []
+    for metric, kind, help_text, key in metrics:
+        lines.append(f"# HELP {prefix}_{metric} {help_text}")
+        lines.append(f"# TYPE {prefix}_{metric} {kind}")
+        for name, stats in sorted(snap['timers'].items()):
+            lines.append(f'{prefix}_{metric}{{stage="{name}"}} {stats[key]}')
+    lines.append(f"# HELP {prefix}_events_total Event counters")
+    lines.append(f"# TYPE {prefix}_events_total counter")
+    for name, value in sorted(snap['counters'].items()):
+        lines.append(f'{prefix}_events_total{{name="{name}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path, snap=None):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(prometheus_text(snap))
+    os.replace(tmp_path, path)
+    return path
+
+
+class PeriodicReporter:
+    # interval초마다 요약을 output(기본 print)으로 내보내는 백그라운드 스레드
+    def __init__(self, interval=30.0, output=print):
+        self.interval = interval
+        self.output = output
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.output(format_summary())
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="instrumentation-report", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+class SamplingProfiler:
+    # interval초마다 모든 스레드의 호출 스택을 기록하는 샘플링 프로파일러 (한 번의 실행에만 켜서 사용)
+    # 결과는 flamegraph.pl / speedscope에서 읽을 수 있는 collapsed stack 형식
+    def __init__(self, interval=PROFILE_INTERVAL, max_depth=64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _label(frame):
+        code = frame.f_code
+        return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+    def _sample(self):
+        # 프로파일러/요약 출력 스레드는 제외
+        skipped = {thread.ident for thread in threading.enumerate() if thread.name in _INTERNAL_THREADS}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id in skipped:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(self._label(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def collapsed(self):
+        return "\n".join(f"{stack} {n}" for stack, n in self.stacks.most_common()) + "\n"
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.collapsed())
+        return path
+
+    # 가장 많이 샘플된 함수 (스택 맨 위 = 실제로 실행 중이던 함수)
+    def top(self, n=15):
+        leaves = Counter()
+        for stack, samples in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += samples
+        total = sum(leaves.values()) or 1
+        return [(name, samples, samples / total) for name, samples in leaves.most_common(n)]
+
+    def format_top(self, n=15):
+        lines = [f"sampling profile - {self.samples} samples every {self.interval * 1000:.0f}ms"]
+        lines.extend(f"{share:>7.1%} {samples:>8}  {name}" for name, samples, share in self.top(n))
+        return "\n".join(lines)
@@ -0,0 +1,170 @@
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from emotion_labels import EMOTION_LABELS
+from lyrics_preprocessing import sentence_preprocessing
+from lyrics_emotion_analysis_KR import POLARITY_MODEL_PATHS
+from song_catalog import DEFAULT_CSV_PATH, get_catalog
+
+VOCAB_PATH = 'data/vocab_9class_500.csv'
+STOPWORDS_PATH = 'data/stopwords.txt'
+# 대화 분석에 쓸 긍/부정 모델 (bert, tflite, ngram : lyrics_emotion_analysis_KR.POLARITY_MODEL_PATHS)
+POLARITY_BACKEND = os.getenv('POLARITY_BACKEND', 'bert')
+MODEL_CHECKPOINT_PATH = POLARITY_MODEL_PATHS.get(POLARITY_BACKEND, POLARITY_BACKEND)
+
+MIN_CONFIDENCE = 0.35  # 1위 감정 비율이 이보다 낮으면 LLM 분석으로 넘김
+
+
+# 대화 메시지 -> 문장 리스트 (가사 분석과 같은 전처리)
+def messages_to_sentences(texts):
+    sentences = []
+    for text in texts:
+        for piece in re.split('[.!?\r\n]+', text):
+            # 짧은 문장("너무 슬퍼")은 길이 조건에 걸러지므로 특수문자만 지우고 그대로 사용
+            corpus = sentence_preprocessing([piece]) or [" ".join(re.sub('[^\\w]', " ", piece).split())]
+            sentences.extend(sentence for sentence in corpus if sentence)
+    return sentences
+
+
+class LocalEmotionAnalyzer:
+    # 사용자 발화를 가사 분석과 같은 하이브리드 방식(감정 사전 + BERT 긍/부정)으로 분석
+    def __init__(self, model, lexicon, cache=None, min_confidence=MIN_CONFIDENCE):
+        self.model = model
+        self.lexicon = lexicon
+        self.cache = cache
+        self.min_confidence = min_confidence
+
+    @classmethod
+    def load(cls, vocab_path=VOCAB_PATH, stopwords_path=STOPWORDS_PATH,
+             model_checkpoint_path=MODEL_CHECKPOINT_PATH, min_confidence=MIN_CONFIDENCE):
+        from lyrics_emotion_analysis_KR import load_lexicon, load_model
+
+        return cls(load_model(model_checkpoint_path), load_lexicon(vocab_path, stopwords_path),
+                   min_confidence=min_confidence)
+
+    # 감정 코드별 점수 합 (numpy 배열, lexicon.emotions 순서)
+    def scores(self, texts):
+        from lyrics_emotion_analysis_KR import hybrid_emotion_vectors
+
+        sentences = messages_to_sentences(texts)
+        return hybrid_emotion_vectors(sentences, self.model, self.lexicon, cache=self.cache).sum(axis=0)
+
+    # 한국어 감정 라벨 -> 비율
+    def distribution(self, texts):
+        scores = self.scores(texts)
+        total = float(scores.sum())
+        if total <= 0:
+            return {}
+        return {EMOTION_LABELS.get(emotion, emotion): float(score) / total
+                for emotion, score in zip(self.lexicon.emotions, scores) if score > 0}
+
+    # (1위 감정 라벨, 확신도 = 1위 감정 비율)
+    def predict(self, texts):
+        distribution = self.distribution(texts)
+        if not distribution:
+            return None, 0.0
+        emotion = max(distribution, key=distribution.get)
+        return emotion, distribution[emotion]
+
+    # 확신도가 충분할 때만 라벨 반환 (아니면 None)
+    def confident_label(self, texts):
+        emotion, confidence = self.predict(texts)
+        if emotion is None or confidence < self.min_confidence:
+            return None
+        return emotion
+
+
+# 기본 경로의 모델/사전으로 분석기 생성 (모델 파일이나 라이브러리가 없으면 None)
+def load_default_analyzer():
+    if not os.path.exists(os.path.dirname(MODEL_CHECKPOINT_PATH)):
+        print(f"Local emotion model not found: {MODEL_CHECKPOINT_PATH}")
+        return None
+    try:
+        return LocalEmotionAnalyzer.load()
+    except Exception as e:
+        print(f"Local emotion analyzer unavailable: {e}")
+        return None
+
+
+# 모든 세션이 함께 쓰는 분석 스레드 (모델 predict를 동시에 호출하지 않도록 1개)
+_tracker_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="emotion-tracker")
+
+
+class EmotionTracker:
+    # 사용자 메시지가 들어올 때마다 백그라운드에서 감정 점수를 누적
+    # (메시지마다 새 메시지만 분석, 대화가 끝나면 결과와 추천 곡이 이미 준비되어 있음)
+    def __init__(self, analyzer, top_k=6, csv_path=DEFAULT_CSV_PATH):
+        self.analyzer = analyzer
+        self.top_k = top_k
+        self.csv_path = csv_path
+        self.scores = None
+        self.emotion = None
+        self.confidence = 0.0
+        self.songs = []
+        self.songs_emotion = None
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def update(self, text):
+        future = _tracker_executor.submit(self._update, text)
+        with self._lock:
+            self._pending = [f for f in self._pending if not f.done()] + [future]
+        return future
+
+    def _update(self, text):
+        scores = self.analyzer.scores([text])
+        with self._lock:
+            self.scores = scores if self.scores is None else self.scores + scores
+            total = float(self.scores.sum())
+            if total <= 0:
+                return
+            best = int(self.scores.argmax())
+            self.emotion = EMOTION_LABELS.get(self.analyzer.lexicon.emotions[best])
+            self.confidence = float(self.scores[best]) / total
+            emotion = self.emotion
+            distribution = dict(zip(self.analyzer.lexicon.emotions, self.scores.tolist()))
+        # 지금까지의 감정 분포와 감정 비율이 가까운 곡을 미리 조회
+        songs = get_catalog(self.csv_path).nearest_songs(distribution, k=self.top_k)
+        with self._lock:
+            self.songs, self.songs_emotion = songs, emotion
+
+    # 아직 끝나지 않은 분석을 기다림 (보통 마지막 메시지 하나뿐)
+    def wait(self, timeout=None):
+        with self._lock:
+            pending = list(self._pending)
+        for future in pending:
+            try:
+                future.result(timeout=timeout)
+            except Exception as e:
+                print(f"Emotion Tracker Error: {e}")
+
+    # 한국어 감정 라벨 -> 비율
+    def distribution(self):
+        self.wait()
+        with self._lock:
+            if self.scores is None or float(self.scores.sum()) <= 0:
+                return {}
+            total = float(self.scores.sum())
+            return {EMOTION_LABELS.get(emotion, emotion): float(score) / total
+                    for emotion, score in zip(self.analyzer.lexicon.emotions, self.scores) if score > 0}
+
+    # (1위 감정 라벨, 확신도)
+    def result(self, timeout=None):
+        self.wait(timeout)
+        return self.emotion, self.confidence
+
+    # 확신도가 충분할 때만 라벨 반환 (아니면 None)
+    def confident_label(self, timeout=None):
+        emotion, confidence = self.result(timeout)
+        if emotion is None or confidence < self.analyzer.min_confidence:
+            return None
+        return emotion
+
+    # 미리 조회해 둔 추천 곡 (감정이 다르면 None)
+    def songs_for(self, emotion, limit):
+        with self._lock:
+            if emotion != self.songs_emotion or limit > self.top_k:
+                return None
+            return self.songs[:limit]
@@ -1,20 +1,98 @@
-from lyrics_preprocessing import lyrics_to_corpus, sentence_preprocessing, lexicon_tokenizer_komoran
-from transformers import *
-import tensorflow as tf
-import pandas as pd
+import os
+import threading
+
 import numpy as np
-from collections import Counter
-from konlpy.tag import Komoran
 
-kmoran = Komoran()
-MAX_LEN = 30  # EDA를 통해 나온 결과 ( padding 을 위해 필요 )
+from lyrics_preprocessing import lyrics_to_corpus, sentence_preprocessing, lexicon_tokenizer_komoran, KomoranTokenizer
+from emotion_labels import POSITIVE_EMOTIONS, NEGATIVE_EMOTIONS
+from instrumentation import count, timed, timer
+
+# 무거운 자원(transformers/TF, Bert tokenizer, Komoran JVM)은 처음 사용할 때 만듦
+# (사전/전처리 함수만 쓰는 도구나 워커가 import 만으로 몇 초씩 기다리지 않도록)
+# 학습/추론 공통 최대 토큰 수 (EDA를 통해 나온 결과, 더 긴 문장은 잘라냄)
+# 실제 padding은 배치마다 그 배치의 가장 긴 문장 길이(PAD_MULTIPLE 단위)까지만 함
+MAX_LEN = 30
+PAD_MULTIPLE = 8  # 배치 길이를 이 배수로 올림 (입력 shape 종류를 줄여 재트레이싱 방지)
+PREDICT_BATCH_SIZE = 64  # model.predict 한 번에 넣는 문장 수
+BERT_MODEL_NAME = "bert-base-multilingual-cased"
+BERT_CACHE_DIR = 'bert_ckpt'
+TFLITE_SUFFIX = '.tflite'  # model_export.py로 내보낸 추론 전용 모델
+NGRAM_SUFFIX = '.npz'  # ngram_polarity.py로 학습한 문자 n-gram 선형 모델
+# 긍/부정 판별 backend별 기본 모델 경로 (bert : 학습된 keras 가중치, tflite : 내보낸 BERT, ngram : 가벼운 선형 모델)
+POLARITY_MODEL_PATHS = {
+    'bert': os.path.join("model", "tf2_bert_sentiment", "best_model"),
+    'tflite': os.path.join("model", "tf2_bert_sentiment", "model" + TFLITE_SUFFIX),
+    'ngram': os.path.join("model", "ngram_polarity", "model" + NGRAM_SUFFIX),
+}
+
+_resources = {}
+_resources_lock = threading.RLock()
+
+
+def _get_resource(name, factory):
+    if name not in _resources:
+        with _resources_lock:
+            if name not in _resources:
+                _resources[name] = factory()
+    return _resources[name]
+
 
 # 사전에 정의된 Bert tokenizer 가져오기
-tokenizer = BertTokenizer.from_pretrained("bert-base-multilingual-cased", cache_dir='bert_ckpt', do_lower_case=False)
+def get_bert_tokenizer():
+    def create():
+        from transformers import BertTokenizer
+        return BertTokenizer.from_pretrained(BERT_MODEL_NAME, cache_dir=BERT_CACHE_DIR, do_lower_case=False)
+    return _get_resource('tokenizer', create)
+
+
+# 같은 vocab의 Rust 기반 tokenizer (여러 문장을 한 번에 토큰화할 때 사용)
+def get_fast_bert_tokenizer():
+    def create():
+        from transformers import BertTokenizerFast
+        return BertTokenizerFast.from_pretrained(BERT_MODEL_NAME, cache_dir=BERT_CACHE_DIR, do_lower_case=False)
+    return _get_resource('fast_tokenizer', create)
+
+
+def get_komoran():
+    def create():
+        from konlpy.tag import Komoran
+        return Komoran()
+    return _get_resource('kmoran', create)
+
+
+# 문장별 형태소 분석 결과 캐시 (캐시에 없는 문장이 나올 때 Komoran JVM 시작)
+def get_komoran_tokenizer():
+    return _get_resource('komoran_tokenizer', lambda: KomoranTokenizer(kmoran_factory=get_komoran))
+
+
+# 형태소 분석 캐시를 파일(SQLite)에도 저장하도록 교체
+def use_komoran_cache(db_path, max_items=200000):
+    with _resources_lock:
+        previous = _resources.pop('komoran_tokenizer', None)
+        if previous is not None:
+            previous.close()
+        _resources['komoran_tokenizer'] = KomoranTokenizer(max_items=max_items, db_path=db_path,
+                                                           kmoran_factory=get_komoran)
+    return _resources['komoran_tokenizer']
+
+
+# 예전 이름(tokenizer, kmoran, komoran_tokenizer, TFBertClassifier)도 처음 접근할 때 만듦
+def __getattr__(name):
+    if name == 'tokenizer':
+        return get_bert_tokenizer()
+    if name == 'kmoran':
+        return get_komoran()
+    if name == 'komoran_tokenizer':
+        return get_komoran_tokenizer()
+    if name == 'TFBertClassifier':
+        return get_classifier_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # 감정 단어 사전 불러오기
 def load_vocab(vocab_path, stopwords_path):
+    import pandas as pd
+
     vocab_df = pd.read_csv(vocab_path, encoding='cp949', index_col=0)
     vocab = vocab_df.T.to_dict()
 
@@ -31,7 +109,7 @@ def load_vocab(vocab_path, stopwords_path):
 
 
 def bert_tokenizer(sent, MAX_LEN):
-    encoded_dict = tokenizer.encode_plus(
+    encoded_dict = get_bert_tokenizer().encode_plus(
         text=sent,
         add_special_tokens=True,  # Add '[CLS]' and '[SEP]'
         max_length=MAX_LEN,  # Pad & truncate all sentences.
@@ -46,136 +124,319 @@ def bert_tokenizer(sent, MAX_LEN):
     return input_id, attention_mask, token_type_id
 
 
-class TFBertClassifier(tf.keras.Model):
-    def __init__(self, model_name, dir_path):
-        super(TFBertClassifier, self).__init__()
-
-        self.bert = TFBertModel.from_pretrained(model_name, cache_dir=dir_path)
-        self.dropout = tf.keras.layers.Dropout(self.bert.config.hidden_dropout_prob)
-        self.classifier = tf.keras.layers.Dense(1,
-                                                activation='sigmoid',
-                                                kernel_initializer=tf.keras.initializers.TruncatedNormal(
-                                                    self.bert.config.initializer_range),
-                                                name="classifier")
-
-    def get_config(self):
-        config = super().get_config().copy()
-        config.update({
-            'bert': self.bert,
-            'dropout': self.dropout,
-            'classifier': self.classifier,
-        })
-        return config
-
-    def call(self, inputs, attention_mask=None, token_type_ids=None, training=False):
-        # outputs 값: # sequence_output, pooled_output, (hidden_states), (attentions)
-        outputs = self.bert(inputs, attention_mask=attention_mask, token_type_ids=token_type_ids)
-        pooled_output = outputs[1]
-        pooled_output = self.dropout(pooled_output, training=training)
-        logits = self.classifier(pooled_output)
-        return logits
+# tf.keras.Model을 상속하므로 TF를 불러오는 시점까지 클래스 생성을 미룸
+def get_classifier_class():
+    def create():
+        import tensorflow as tf
+        from transformers import TFBertModel
+
+        class TFBertClassifier(tf.keras.Model):
+            # config(BertConfig)가 주어지면 사전학습 가중치를 받지 않고 임의 초기화 (테스트/내보내기 확인용)
+            def __init__(self, model_name, dir_path, config=None):
+                super(TFBertClassifier, self).__init__()
+
+                if config is not None:
+                    self.bert = TFBertModel(config)
+                else:
+                    self.bert = TFBertModel.from_pretrained(model_name, cache_dir=dir_path)
+                self.dropout = tf.keras.layers.Dropout(self.bert.config.hidden_dropout_prob)
+                self.classifier = tf.keras.layers.Dense(1,
+                                                        activation='sigmoid',
+                                                        kernel_initializer=tf.keras.initializers.TruncatedNormal(
+                                                            self.bert.config.initializer_range),
+                                                        name="classifier")
+
+            def get_config(self):
+                config = super().get_config().copy()
+                config.update({
+                    'bert': self.bert,
+                    'dropout': self.dropout,
+                    'classifier': self.classifier,
+                })
+                return config
+
+            def call(self, inputs, attention_mask=None, token_type_ids=None, training=False):
+                # outputs 값: # sequence_output, pooled_output, (hidden_states), (attentions)
+                outputs = self.bert(inputs, attention_mask=attention_mask, token_type_ids=token_type_ids)
+                pooled_output = outputs[1]
+                pooled_output = self.dropout(pooled_output, training=training)
+                logits = self.classifier(pooled_output)
+                return logits
+
+        TFBertClassifier.__qualname__ = 'TFBertClassifier'
+        return TFBertClassifier
+    return _get_resource('TFBertClassifier', create)
 
 
 def load_model(checkpoint_path):
+    # 내보낸 TFLite 모델이면 인터프리터로 실행 (BERT 모델 생성, 가중치 로드 없음)
+    if checkpoint_path.endswith(TFLITE_SUFFIX):
+        from model_export import TFLiteClassifier
+        return TFLiteClassifier(checkpoint_path)
+    if checkpoint_path.endswith(NGRAM_SUFFIX):
+        from ngram_polarity import NgramPolarityModel
+        return NgramPolarityModel.load(checkpoint_path)
     # 모델 객체 생성
-    model = TFBertClassifier(model_name='bert-base-multilingual-cased', dir_path='bert_ckpt')
+    model = get_classifier_class()(model_name=BERT_MODEL_NAME, dir_path=BERT_CACHE_DIR)
     model.load_weights(checkpoint_path)
     return model
 
 
 # 문장 -> 버트 input 값으로 변환
 def sentence_convert_data(data):
-    global bert_tokenizer
-    tokens, masks, segment = [], [], []
-    input_id, attention_mask, token_type_id = bert_tokenizer(data, MAX_LEN)
+    return sentences_convert_data([data])
+
 
-    tokens.append(input_id)
-    masks.append(attention_mask)
-    segment.append(token_type_id)
+# 여러 문장 -> 하나의 버트 input 배치로 변환
+def sentences_convert_data(sentences):
+    tokens, masks, segments = [], [], []
+    for sentence in sentences:
+        input_id, attention_mask, token_type_id = bert_tokenizer(sentence, MAX_LEN)
+
+        tokens.append(input_id)
+        masks.append(attention_mask)
+        segments.append(token_type_id)
 
     tokens = np.array(tokens, dtype=int)
     masks = np.array(masks, dtype=int)
-    segments = np.array(segment, dtype=int)
+    segments = np.array(segments, dtype=int)
+
+    return [tokens, masks, segments]
+
+
+# 여러 문장 -> 문장별 토큰 id 리스트 ([CLS] ... [SEP], max_len에서 자름, padding 없음)
+def tokenize_sentences(sentences, max_len=MAX_LEN, tokenizer=None):
+    tokenizer = tokenizer or get_fast_bert_tokenizer()
+    with timer('tokenize'):
+        return tokenizer(list(sentences), add_special_tokens=True, max_length=max_len, truncation=True,
+                         padding=False, return_attention_mask=False, return_token_type_ids=False)['input_ids']
+
+
+# 배치 안의 가장 긴 길이를 PAD_MULTIPLE 배수로 올린 값 (max_len 이하)
+def padded_length(length, max_len=MAX_LEN):
+    return min(max_len, -(-length // PAD_MULTIPLE) * PAD_MULTIPLE)
 
+
+# 토큰 id 리스트들 -> 배치 길이까지만 padding한 버트 input
+def pad_batch(token_ids, max_len=MAX_LEN):
+    width = padded_length(max(len(ids) for ids in token_ids), max_len)
+    tokens = np.zeros((len(token_ids), width), dtype=np.int32)
+    masks = np.zeros((len(token_ids), width), dtype=np.int32)
+    for i, ids in enumerate(token_ids):
+        tokens[i, :len(ids)] = ids
+        masks[i, :len(ids)] = 1
+    segments = np.zeros((len(token_ids), width), dtype=np.int32)
     return [tokens, masks, segments]
 
 
+# 토큰 id 리스트들 -> 문장별 긍정 확률 (model은 keras 모델 또는 TFLiteClassifier)
+# 길이순으로 정렬해 비슷한 길이끼리 배치를 만들고, 배치마다 그 안의 최대 길이까지만 padding
+def predict_probabilities(token_ids, model, batch_size=PREDICT_BATCH_SIZE):
+    order = np.argsort([len(ids) for ids in token_ids], kind='stable')
+    predict_value = np.zeros(len(token_ids), dtype=np.float32)
+    for start in range(0, len(order), batch_size):
+        rows = order[start:start + batch_size]
+        data_x = pad_batch([token_ids[i] for i in rows])
+        # 결과는 원래 문장 순서 자리에 기록
+        with timer('predict'):
+            predict_value[rows] = np.ravel(model.predict(data_x, batch_size=len(rows), verbose=0))
+    return predict_value
+
+
+# backend 이름('bert', 'tflite', 'ngram') 또는 모델 경로 -> 불러온 모델 (경로별로 한 번만 불러옴)
+def get_polarity_model(backend):
+    path = POLARITY_MODEL_PATHS.get(backend, backend)
+    return _get_resource(('polarity_model', path), lambda: load_model(path))
+
+
+# 문장 리스트 -> 문장별 긍정 확률
+# 문장을 직접 받는 모델(NgramPolarityModel)은 predict_sentences, 그 외(keras, TFLite)는 BERT 토큰 입력으로 판별
+def predict_sentence_probabilities(sentences, model, batch_size=PREDICT_BATCH_SIZE):
+    if isinstance(model, str):
+        model = get_polarity_model(model)
+    count('predict.sentences', len(sentences))
+    if hasattr(model, 'predict_sentences'):
+        with timer('predict'):
+            return np.asarray(model.predict_sentences(sentences), dtype=np.float32)
+    return predict_probabilities(tokenize_sentences(sentences), model, batch_size=batch_size)
+
+
 # 문장 긍/부정 판별 함수
-def lyrics_evaluation_predict(sentence, model):
-    data_x = sentence_convert_data(sentence)
-    predict = model.predict(data_x)
-    predict_value = np.ravel(predict[0])
-    predict_answer = np.round(predict_value, 0).item()
+def lyrics_evaluation_predict(sentence, model, cache=None):
+    return lyrics_evaluation_predict_batch([sentence], model, cache=cache)[0]
+
+
+# 여러 문장의 긍/부정을 판별 (문장 순서대로 1: 긍정, 0: 부정)
+# model : 불러온 모델 또는 get_polarity_model에 넘길 backend 이름/경로 (hybrid_emotion_* 함수들도 그대로 전달)
+# cache(PolarityCache)가 주어지면 캐시에 없는 문장만 모델에 넣음
+def lyrics_evaluation_predict_batch(sentences, model, batch_size=PREDICT_BATCH_SIZE, cache=None):
+    if len(sentences) == 0:
+        return []
+    if cache is not None:
+        return cache.lookup_or_predict(sentences, lambda missing: lyrics_evaluation_predict_batch(
+            missing, model, batch_size=batch_size))
+    predict_value = predict_sentence_probabilities(sentences, model, batch_size=batch_size)
+    predict_answer = np.round(predict_value, 0).astype(int)
+
+    return predict_answer.tolist()
+
+
+# 감정 어휘 사전을 단어 -> 행 번호 + (단어 수 x 감정 수) 행렬로 변환
+class EmotionLexicon:
+    def __init__(self, vocab):
+        self.emotions = list(dict.fromkeys(emotion for scores in vocab.values() for emotion in scores))
+        self.index = {word: i for i, word in enumerate(vocab)}
+        self.matrix = np.array([[vocab[word].get(emotion, 0) for emotion in self.emotions] for word in vocab],
+                               dtype=np.float32).reshape(len(vocab), len(self.emotions))
+        # 빈 칸(NaN)은 0점
+        self.matrix = np.nan_to_num(self.matrix, nan=0.0)
+
+        # 긍정(1)/부정(0) 문장에서 남길 감정 : polarity_mask[polarity]
+        self.polarity_mask = np.ones((2, len(self.emotions)), dtype=np.float32)
+        for polarity, removed in ((1, NEGATIVE_EMOTIONS), (0, POSITIVE_EMOTIONS)):
+            for emotion in removed:
+                if emotion in self.emotions:
+                    self.polarity_mask[polarity, self.emotions.index(emotion)] = 0
 
-    return int(predict_answer)
+    # 문장별 단어 리스트 -> 문장별 감정 점수 (bag-of-words x 감정 행렬)
+    def score(self, tokenized_sentences):
+        rows = [[self.index[word] for word in words if word in self.index] for words in tokenized_sentences]
+        lengths = np.array([len(row) for row in rows], dtype=np.int64)
+        word_ids = np.fromiter((i for row in rows for i in row), dtype=np.int64, count=int(lengths.sum()))
+        return segment_sum(self.matrix[word_ids], lengths, len(self.emotions))
+
+    # 감정 점수 벡터 -> {감정: 점수} (점수가 있는 감정만)
+    def to_dict(self, scores):
+        return {emotion: float(score) for emotion, score in zip(self.emotions, scores) if score > 0}
+
+
+# 연속된 행들을 lengths 길이만큼 묶어서 합산 (빈 묶음은 0)
+def segment_sum(values, lengths, width):
+    out = np.zeros((len(lengths), width), dtype=np.float32)
+    nonempty = lengths > 0
+    if values.shape[0] > 0:
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        out[nonempty] = np.add.reduceat(values, offsets[nonempty], axis=0)
+    return out
+
+
+# dict 사전 -> EmotionLexicon (dict는 호출할 때마다 새로 변환하므로, 반복 호출에는 load_lexicon 결과를 넘길 것)
+def compile_vocab(vocab):
+    return vocab if isinstance(vocab, EmotionLexicon) else EmotionLexicon(vocab)
+
+
+# 감정 어휘 사전을 불러와 바로 행렬 형태로 변환
+def load_lexicon(vocab_path, stopwords_path):
+    return compile_vocab(load_vocab(vocab_path, stopwords_path))
+
+
+# 여러 문장의 단어별 감정 점수 합산 (사전 기반) -> (문장 수 x 감정 수)
+def lexicon_emotion_vectors(sentences, lexicon):
+    tokenized = get_komoran_tokenizer().tokenize_batch(sentences)
+    with timer('lexicon_score'):
+        return lexicon.score(tokenized)
+
+
+# 문장의 단어별 감정 점수 합산 (사전 기반)
+def lexicon_emotion_score(sentence, vocab):
+    lexicon = compile_vocab(vocab)
+    return lexicon.to_dict(lexicon_emotion_vectors([sentence], lexicon)[0])
+
+
+# 긍/부정 결과에 맞지 않는 감정 점수 제거
+def polarity_filter(emotion_score, polarity):
+    # 긍정일 경우 슬픔/분노/외로움/그리움/두려움 점수를 제거
+    # 부정일 경우 사랑/즐거움/열정/행복 점수를 제거
+    removed = NEGATIVE_EMOTIONS if polarity == 1 else POSITIVE_EMOTIONS
+    for emotion in removed:
+        emotion_score.pop(emotion, None)
+    return emotion_score
+
+
+def hybrid_emotion_clf(sentence, model, vocab, polarity=None, cache=None):
+    emotion_score = lexicon_emotion_score(sentence, vocab)
+    # 긍/부정 결과가 미리 주어지지 않은 경우에만 모델 호출
+    if polarity is None:
+        polarity = lyrics_evaluation_predict(sentence, model, cache=cache)
+    return polarity_filter(emotion_score, polarity)
+
+
+# 여러 문장을 한 번에 분류 (모델 호출은 1회) -> 긍/부정 적용된 (문장 수 x 감정 수)
+def hybrid_emotion_vectors(sentences, model, lexicon, cache=None):
+    # 형태소 분석을 먼저 해서 n-gram 모델의 사전 특징이 같은 분석 결과(캐시)를 다시 쓰게 함
+    scores = lexicon_emotion_vectors(sentences, lexicon)
+    polarities = np.array(lyrics_evaluation_predict_batch(sentences, model, cache=cache), dtype=np.int64)
+    if len(sentences) == 0:
+        return scores
+    return scores * lexicon.polarity_mask[polarities]
+
+
+def hybrid_emotion_clf_batch(sentences, model, vocab, cache=None):
+    lexicon = compile_vocab(vocab)
+    return [lexicon.to_dict(scores) for scores in hybrid_emotion_vectors(sentences, model, lexicon, cache=cache)]
 
 
-def hybrid_emotion_clf(sentence, model, vocab):
-    emotion_score = Counter()
-    # 단어 별로 감정 점수를 더함
-    for word in lexicon_tokenizer_komoran(sentence, kmoran):
-        try:
-            # 문장이 가지고 있는 각 단어들의 감정점수를 합산
-            emotion_score = emotion_score + Counter(vocab[word])
-        except KeyError:  # 단어가 vocab에 없는 경우는 pass
-            pass
-    # 문장이 가지고 있는 감정 점수
-    emotion_score = dict(emotion_score)
+# 여러 곡의 문장을 모두 모아 한 번에 분류한 뒤 곡 단위 감정 점수로 다시 합산 -> (곡 수 x 감정 수)
+def songs_emotion_score(corpora, model, lexicon, cache=None):
+    sentences = [sentence for corpus in corpora for sentence in corpus]
+    sentence_scores = hybrid_emotion_vectors(sentences, model, lexicon, cache=cache)
+    lengths = np.array([len(corpus) for corpus in corpora], dtype=np.int64)
+    return segment_sum(sentence_scores, lengths, len(lexicon.emotions))
+
+
+# 감정 점수 상위 3개 (부족한 자리는 None)
+def top3_emotions(scores, emotions):
+    # 점수 순 정렬 (같은 점수는 사전 컬럼 순서)
+    order = [i for i in np.argsort(-scores, kind='stable') if scores[i] > 0]
+    top = [emotions[i] for i in order[:3]]
+    return top + [None] * (3 - len(top))
 
-    # 긍정일 경우 슬픔/분노/공허 점수를 제거
-    if lyrics_evaluation_predict(sentence, model) == 1:
-        try:
-            emotion_score.pop('sadness')
-            emotion_score.pop('anger')
-            emotion_score.pop('lonely')
-            emotion_score.pop('longing')
-            emotion_score.pop('fear')
-        except:
-            pass
-        return emotion_score
-    # 부정일 경우 떨림/사랑/즐거움 점수를 제거
-    elif lyrics_evaluation_predict(sentence, model) == 0:
-        try:
-            emotion_score.pop('love')
-            emotion_score.pop('fun')
-            emotion_score.pop('enthusiasm')
-            emotion_score.pop('happyness')
-        except:
-            pass
-        return emotion_score
 
+def hybrid_emotion_analysis(lyrics, model, vocab, cache=None):
+    return hybrid_emotion_analysis_batch([lyrics], model, vocab, cache=cache)[0]
 
-def hybrid_emotion_analysis(lyrics, model, vocab):
-    # None fittering & 짧은 가사 제거 "50미만" ex)기타 연주곡입니다.
-    if lyrics == "None" and len(lyrics) < 50:
-        return [None, None, None]
-    # 가사데이터 문장 분할 및 전처리
-    corpus = sentence_preprocessing(lyrics_to_corpus(lyrics))
-    emotion_score = Counter()
-    for sentence in corpus:
-        emotion_score = emotion_score + Counter(hybrid_emotion_clf(sentence, model, vocab))
-
-    # 딕셔너리 value로 정렬
-    res = dict(sorted(emotion_score.items(), key=(lambda x: x[1]), reverse=True))
-
-    if len(res) == 0:
-        return [None, None, None]
-    elif len(res) == 1:
-        return [list(res.keys())[0], None, None]
-    elif len(res) == 2:
-        return [list(res.keys())[0], list(res.keys())[1], None]
-    else:
-        # 상위 3개 key값만 가져옴
-        return list(res.keys())[:3]
 
+# 여러 곡을 한 번에 분석 (곡 순서대로 [emotion1, emotion2, emotion3] 반환)
+@timed('analysis')
+def hybrid_emotion_analysis_batch(lyrics_list, model, vocab, cache=None):
+    lexicon = compile_vocab(vocab)
+    count('songs', len(lyrics_list))
+    corpora = []
+    with timer('preprocess'):
+        for lyrics in lyrics_list:
+            # None fittering & 짧은 가사 제거 "50미만" ex)기타 연주곡입니다.
+            if not isinstance(lyrics, str) or (lyrics == "None" and len(lyrics) < 50):
+                corpora.append(None)
+            else:
+                # 가사데이터 문장 분할 및 전처리
+                corpora.append(sentence_preprocessing(lyrics_to_corpus(lyrics)))
+
+    song_scores = iter(songs_emotion_score([corpus for corpus in corpora if corpus is not None],
+                                           model, lexicon, cache=cache))
 
-def hybrid_emotion_export_persent(lyrics, model, vocab):
+    results = []
+    for corpus in corpora:
+        if corpus is None:
+            results.append([None, None, None])
+        else:
+            results.append(top3_emotions(next(song_scores), lexicon.emotions))
+    return results
+
+
+def hybrid_emotion_export_persent(lyrics, model, vocab, cache=None):
+    return hybrid_emotion_export_persent_batch([lyrics], model, vocab, cache=cache)[0]
+
+
+def hybrid_emotion_export_persent_batch(lyrics_list, model, vocab, cache=None):
+    lexicon = compile_vocab(vocab)
     # 가사데이터 문장 분할 및 전처리
-    corpus = sentence_preprocessing(lyrics_to_corpus(lyrics))
-    emotion_score = Counter()
-    for sentence in corpus:
-        emotion_score = emotion_score + Counter(hybrid_emotion_clf(sentence, model, vocab))
+    corpora = [sentence_preprocessing(lyrics_to_corpus(lyrics)) for lyrics in lyrics_list]
+    return [emotion_persent(lexicon.to_dict(scores))
+            for scores in songs_emotion_score(corpora, model, lexicon, cache=cache)]
+
 
+# 곡의 감정 점수 -> 감정별 비율 + 상위 3개 감정 라벨
+def emotion_persent(emotion_score):
     # 예측결과를 비율(%)로 변경.
     total = sum(emotion_score.values())
     for emotion in list(emotion_score.keys()):
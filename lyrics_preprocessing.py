@@ -1,10 +1,15 @@
+import os
 import re
+import sqlite3
+from collections import OrderedDict
+
+from instrumentation import count, timer
 
 # 가사 문장별 분리
 def lyrics_to_corpus(lyrics):
     lyrics = re.split('\r\n|\n',lyrics)
-    #중복제거
-    corpus = list(set(lyrics))
+    #중복제거 (가사 순서 유지 : 워커/실행마다 같은 결과가 나오도록)
+    corpus = list(dict.fromkeys(lyrics))
     return corpus
 
 # 가사 문장별 전처리
@@ -15,8 +20,8 @@ def sentence_preprocessing(corpus):
     corpus = [sentence.strip() for sentence in corpus]
     #길이 5개 미만 제거
     corpus = [sentence for sentence in corpus if len(sentence) > 5]
-    #같은 단어 반복 제거 ex) Oh Oh Oh Oh
-    corpus = [list(set(sentence.split())) for sentence in corpus]
+    #같은 단어 반복 제거 ex) Oh Oh Oh Oh (실행마다 같은 문장이 나오도록 순서 유지)
+    corpus = [list(dict.fromkeys(sentence.split())) for sentence in corpus]
     # 2차원 리스트 -> 1차원
     corpus = [" ".join(sentence) for sentence in corpus]
     return corpus
@@ -24,8 +29,13 @@ def sentence_preprocessing(corpus):
 
 #통일 시켜주기 위함
 def lexicon_tokenizer_komoran(corpus,kmoran):
+    return lexicon_filter(kmoran.pos(corpus))
+
+
+#형태소 태깅 결과 -> 감정 사전 단어 형태
+def lexicon_filter(tagged):
     temp = []
-    for i in kmoran.pos(corpus):
+    for i in tagged:
         if (i[1] == 'NNG' or i[1] == 'NNP'):
             temp.append(i[0])
         elif (i[1] == 'VV' or i[1] == 'VA'):
@@ -35,6 +45,136 @@ def lexicon_tokenizer_komoran(corpus,kmoran):
     return temp
 
 
+#여러 문장을 한 번에 태깅할 때 문장 사이에 넣는 구분자 (Komoran은 SF로 태깅)
+KOMORAN_SENTINEL = '.'
+
+
+class KomoranTokenizer:
+    #lexicon_tokenizer_komoran 결과 캐시 (메모리 LRU + 선택적 SQLite) + 여러 문장을 JVM 호출 한 번에 태깅
+    #kmoran_factory : Komoran 객체 대신 넘기면 캐시에 없는 문장이 처음 나올 때 생성 (JVM 시작을 미룸)
+    def __init__(self, kmoran=None, max_items=200000, db_path=None, batch_size=200, kmoran_factory=None):
+        self._kmoran = kmoran
+        self.kmoran_factory = kmoran_factory
+        self.max_items = max_items
+        self.batch_size = batch_size
+        self.memory = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.jvm_calls = 0
+
+        self.conn = None
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+            self.conn = sqlite3.connect(db_path, timeout=60)
+            self.conn.execute("CREATE TABLE IF NOT EXISTS komoran (sentence TEXT PRIMARY KEY, tokens TEXT)")
+            self.conn.commit()
+
+    @property
+    def kmoran(self):
+        if self._kmoran is None:
+            self._kmoran = self.kmoran_factory()
+        return self._kmoran
+
+    def _remember(self, sentence, tokens):
+        self.memory[sentence] = tokens
+        self.memory.move_to_end(sentence)
+        if len(self.memory) > self.max_items:
+            self.memory.popitem(last=False)
+
+    def _disk_get(self, sentences):
+        found = {}
+        if self.conn is None:
+            return found
+        for start in range(0, len(sentences), 900):
+            chunk = sentences[start:start + 900]
+            rows = self.conn.execute("SELECT sentence, tokens FROM komoran WHERE sentence IN ({})".format(
+                ",".join("?" * len(chunk))), chunk)
+            found.update((sentence, tokens.split('\t') if tokens else []) for sentence, tokens in rows)
+        return found
+
+    def _disk_put(self, items):
+        if self.conn is None or not items:
+            return
+        self.conn.executemany("INSERT OR REPLACE INTO komoran VALUES (?, ?)",
+                              [(sentence, '\t'.join(tokens)) for sentence, tokens in items.items()])
+        self.conn.commit()
+
+    def _tag_each(self, sentences):
+        self.jvm_calls += len(sentences)
+        return [lexicon_tokenizer_komoran(sentence, self.kmoran) if sentence.strip() else [] for sentence in sentences]
+
+    #문장들을 구분자로 이어 한 번에 태깅한 뒤 다시 문장별로 나눔
+    def _tag_batch(self, sentences):
+        if len(sentences) == 1 or any(KOMORAN_SENTINEL in sentence for sentence in sentences):
+            return self._tag_each(sentences)
+
+        self.jvm_calls += 1
+        tagged = self.kmoran.pos((" " + KOMORAN_SENTINEL + " ").join(sentences))
+        result = [[]]
+        for morph in tagged:
+            if morph == (KOMORAN_SENTINEL, 'SF'):
+                result.append([])
+            else:
+                result[-1].append(morph)
+
+        #구분자가 다르게 태깅된 경우 문장별로 다시 태깅
+        if len(result) != len(sentences):
+            return self._tag_each(sentences)
+        return [lexicon_filter(morphs) for morphs in result]
+
+    def tokenize(self, sentence):
+        return self.tokenize_batch([sentence])[0]
+
+    def tokenize_batch(self, sentences):
+        result = {}
+        disk_keys = []
+        for sentence in dict.fromkeys(sentences):
+            if sentence in self.memory:
+                self.memory.move_to_end(sentence)
+                result[sentence] = self.memory[sentence]
+                self.hits += 1
+            else:
+                disk_keys.append(sentence)
+
+        for sentence, tokens in self._disk_get(disk_keys).items():
+            result[sentence] = tokens
+            self._remember(sentence, tokens)
+            self.hits += 1
+
+        missing = [sentence for sentence in disk_keys if sentence not in result]
+        self.misses += len(missing)
+        count('komoran.sentences', len(missing))
+        for start in range(0, len(missing), self.batch_size):
+            chunk = missing[start:start + self.batch_size]
+            with timer('komoran'):
+                tagged = dict(zip(chunk, self._tag_batch(chunk)))
+            for sentence, tokens in tagged.items():
+                result[sentence] = tokens
+                self._remember(sentence, tokens)
+            self._disk_put(tagged)
+
+        return [result[sentence] for sentence in sentences]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'jvm_calls': self.jvm_calls,
+                'hit_rate': self.hits / total if total else 0.0}
+
+    def report(self):
+        return format_komoran_stats(self.stats())
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def format_komoran_stats(stats):
+    return ("komoran cache - hit: {hits}, miss: {misses}, hit rate: {hit_rate:.1%}, "
+            "JVM calls: {jvm_calls}").format(**stats)
+
+
 #한글 영어 구분 : 한글이 하나라도 있으면 한글 분류
 def EnglishOrKorean(input_s):
     k_count = 0
@@ -1,30 +1,79 @@
 import os
-import pandas as pd
-from lyrics_emotion_analysis_KR import hybrid_emotion_analysis, load_vocab, load_model
+import argparse
+import instrumentation
+from analysis_pipeline import run_pipeline
+from analysis_manifest import run_incremental
+from lyrics_emotion_analysis_KR import POLARITY_MODEL_PATHS
 
 # 경로 설정
 data_path = 'data/lyrics_by_year_1964_2023.csv'
 vocab_path = 'data/vocab_9class_500.csv'
 stopwords_path = 'data/stopwords.txt'
-model_checkpoint_path = os.path.join("model", "tf2_bert_sentiment", "best_model")
+polarity_cache_path = os.path.join("cache", "polarity_cache.sqlite")
+komoran_cache_path = os.path.join("cache", "komoran_cache.sqlite")
+output_path = 'data/Final_lyrics_emotion_analysis.csv'
+crawling_data_path = 'data/Sub_data/crawling_data.csv'
+manifest_path = 'data/analysis_manifest.csv'
 
-# 데이터 불러오기
-df = pd.read_csv(data_path)
 
-# 감정 어휘 사전 불러오기
-vocab = load_vocab(vocab_path, stopwords_path)
+def parse_args():
+    parser = argparse.ArgumentParser(description="가사 감정 분석")
+    parser.add_argument('--input', default=None, help="가사 CSV (lyric 컬럼 필요)")
+    parser.add_argument('--output', default=output_path)
+    parser.add_argument('--backend', choices=list(POLARITY_MODEL_PATHS), default='bert',
+                        help="문장 긍/부정 판별 모델 (bert, tflite : model_export.py, ngram : ngram_polarity.py)")
+    parser.add_argument('--model', default=None, help="backend 기본 경로 대신 사용할 모델 파일")
+    parser.add_argument('--workers', type=int, default=1, help="분석 프로세스 수")
+    parser.add_argument('--chunksize', type=int, default=2000, help="CSV를 한 번에 읽을 행 수")
+    parser.add_argument('--song-chunk-size', type=int, default=100,
+                        help="한 번의 forward pass에 문장을 모아 넣을 곡 수")
+    parser.add_argument('--no-cache', action='store_true', help="문장 긍/부정, 형태소 분석 캐시 파일 사용 안 함")
+    parser.add_argument('--incremental', action='store_true',
+                        help="새 곡/바뀐 곡만 분석해 최종 파일에 합침 (기본 입력: 크롤링 데이터)")
+    parser.add_argument('--instrument', action='store_true',
+                        help="단계별 시간/횟수 측정 (주기적으로 요약 출력, 끝나면 전체 요약)")
+    parser.add_argument('--report-interval', type=float, default=30.0, help="--instrument 요약 출력 간격 (초)")
+    parser.add_argument('--metrics', default=None, help="측정 결과를 Prometheus 텍스트 형식으로 저장할 경로")
+    parser.add_argument('--profile', default=None,
+                        help="샘플링 프로파일러 결과(collapsed stack) 저장 경로 (이 프로세스만, 워커 프로세스는 제외)")
+    parser.add_argument('--manifest', default=manifest_path, help="증분 분석 기록 파일")
+    return parser.parse_args()
 
-# 학습된 모델 불러오기
-model = load_model(model_checkpoint_path)
 
-# 감정 분석 수행
-emotion_labels = df['lyric'].apply(lambda x: hybrid_emotion_analysis(x, model, vocab))
+if __name__ == '__main__':
+    args = parse_args()
+    cache_path = None if args.no_cache else polarity_cache_path
+    komoran_path = None if args.no_cache else komoran_cache_path
+    model_path = args.model or POLARITY_MODEL_PATHS[args.backend]
 
-# 결과를 컬럼으로 분리하여 저장
-df[['emotion1', 'emotion2', 'emotion3']] = pd.DataFrame(emotion_labels.tolist(), index=df.index)
+    # 워커 프로세스도 환경 변수로 측정을 켬
+    reporter = None
+    if args.instrument or args.metrics:
+        instrumentation.enable()
+        reporter = instrumentation.PeriodicReporter(args.report_interval).start()
+    profiler = instrumentation.SamplingProfiler().start() if args.profile else None
 
-# 파일 저장
-output_path = 'data/Final_lyrics_emotion_analysis.csv'
-df.to_csv(output_path, index=False, encoding='utf-8-sig')
+    if args.incremental:
+        # manifest와 비교해 새로 추가/변경된 곡만 분석한 뒤 최종 파일에 합침
+        run_incremental(args.input or crawling_data_path, args.output, args.manifest,
+                        vocab_path, stopwords_path, model_path,
+                        cache_path=cache_path, komoran_cache_path=komoran_path,
+                        workers=args.workers, chunksize=args.chunksize, song_chunk_size=args.song_chunk_size)
+    else:
+        # CSV를 나눠 읽어 곡 묶음을 워커들에 분배하고, 결과는 끝나는 대로 파일에 씀
+        # (워커마다 Komoran, 감정 어휘 사전, 학습된 모델, 문장 긍/부정 캐시를 한 번씩 불러옴)
+        run_pipeline(args.input or data_path, args.output, vocab_path, stopwords_path, model_path,
+                     cache_path=cache_path, komoran_cache_path=komoran_path,
+                     workers=args.workers, chunksize=args.chunksize, song_chunk_size=args.song_chunk_size)
+
+    print(f"감정 분석 완료: '{args.output}'로 저장됨.")
 
-print(f"감정 분석 완료: '{output_path}'로 저장됨.")
\ No newline at end of file
+    if reporter is not None:
+        reporter.stop()
+        print(instrumentation.format_summary())
+    if args.metrics:
+        print(f"Metrics -> {instrumentation.write_prometheus(args.metrics)}")
+    if profiler is not None:
+        profiler.stop()
+        print(profiler.format_top())
+        print(f"Profile -> {profiler.write(args.profile)}")
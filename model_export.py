@@ -0,0 +1,185 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+
+import numpy as np
+
+from lyrics_emotion_analysis_KR import (BERT_MODEL_NAME, BERT_CACHE_DIR, MAX_LEN, PREDICT_BATCH_SIZE, TFLITE_SUFFIX,
+                                        get_classifier_class, load_model, predict_probabilities, pad_batch,
+                                        tokenize_sentences)
+
+CHECKPOINT_PATH = os.path.join("model", "tf2_bert_sentiment", "best_model")
+SIGNATURE_KEY = 'serving_default'
+OUTPUT_KEY = 'probability'
+INPUT_NAMES = ('input_ids', 'attention_mask', 'token_type_ids')
+# 내보낸 모델과 keras 모델의 긍정 확률 차이 허용치 (int8 양자화는 가중치 오차가 있어 더 크게)
+FLOAT_TOLERANCE = 1e-3
+QUANTIZED_TOLERANCE = 5e-2
+# 네트워크 없이 내보내기/비교를 확인할 때 쓰는 작은 BERT 설정
+TINY_BERT_CONFIG = dict(vocab_size=1000, hidden_size=32, num_hidden_layers=2, num_attention_heads=2,
+                        intermediate_size=64, max_position_embeddings=64)
+
+
+# 체크포인트 옆 기본 저장 경로 (model/x/best_model -> model/x/model.tflite, 양자화 : model_int8.tflite)
+def default_export_path(checkpoint_path, quantize=False):
+    name = 'model_int8' if quantize else 'model'
+    return os.path.join(os.path.dirname(checkpoint_path), name + TFLITE_SUFFIX)
+
+
+# 임의 초기화한 작은 분류기 (사전학습 가중치 다운로드 없음)
+def build_tiny_classifier(seed=0):
+    import tensorflow as tf
+    from transformers import BertConfig
+
+    tf.random.set_seed(seed)
+    model = get_classifier_class()(BERT_MODEL_NAME, BERT_CACHE_DIR, config=BertConfig(**TINY_BERT_CONFIG))
+    model(pad_batch([[1, 2, 3]]), training=False)
+    return model
+
+
+# keras 분류기 -> TFLite 파일
+# 입력은 (문장 수, 길이) int32 3개, 길이는 배치마다 달라도 됨 (pad_batch가 PAD_MULTIPLE 단위로 맞추므로 shape 종류는 몇 개뿐)
+# quantize=True면 가중치를 int8로 저장 (dynamic-range 양자화, 보정용 데이터 필요 없음)
+def export_tflite(model, output_path, quantize=False):
+    import tensorflow as tf
+
+    spec = [tf.TensorSpec([None, None], tf.int32, name=name) for name in INPUT_NAMES]
+
+    @tf.function(input_signature=spec)
+    def serve(input_ids, attention_mask, token_type_ids):
+        return {OUTPUT_KEY: model([input_ids, attention_mask, token_type_ids], training=False)}
+
+    # SavedModel(그래프 + 고정된 가중치)을 거쳐 변환해야 signature 이름이 유지됨
+    # (keras 저장 경로를 거치지 않도록 tf.Module로 감싸서 저장)
+    module = tf.Module()
+    module.model = model
+    module.serve = serve
+    with tempfile.TemporaryDirectory() as saved_model_dir:
+        tf.saved_model.save(module, saved_model_dir, signatures={SIGNATURE_KEY: serve.get_concrete_function()})
+        converter = tf.lite.TFLiteConverter.from_saved_model(saved_model_dir)
+        # 기본 연산만 사용 (tflite_runtime만 설치된 환경에서도 실행 가능)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS]
+        if quantize:
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        flatbuffer = converter.convert()
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(flatbuffer)
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+def _interpreter_class():
+    # 추론만 할 때는 가벼운 tflite_runtime을 우선 사용 (없으면 tensorflow에 포함된 인터프리터)
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+class TFLiteClassifier:
+    # 내보낸 TFLite 분류기 실행기 (keras 모델과 같은 predict 인터페이스라 lyrics_evaluation_predict에 그대로 사용)
+    def __init__(self, model_path, num_threads=None):
+        self.model_path = model_path
+        self.interpreter = _interpreter_class()(model_path=model_path, num_threads=num_threads)
+        self._runner = self.interpreter.get_signature_runner(SIGNATURE_KEY)
+        # 인터프리터는 스레드 간 공유 불가
+        self._lock = threading.Lock()
+
+    def predict(self, inputs, batch_size=None, verbose=0):
+        tokens, masks, segments = [np.asarray(x, dtype=np.int32) for x in inputs]
+        batch_size = batch_size or max(len(tokens), 1)
+        outputs = []
+        with self._lock:
+            for start in range(0, len(tokens), batch_size):
+                stop = start + batch_size
+                result = self._runner(input_ids=tokens[start:stop], attention_mask=masks[start:stop],
+                                      token_type_ids=segments[start:stop])
+                outputs.append(np.array(result[OUTPUT_KEY]))
+        return np.concatenate(outputs) if outputs else np.zeros((0, 1), dtype=np.float32)
+
+
+# 같은 토큰 입력에 대한 keras 모델과 내보낸 모델의 결과 비교
+def check_parity(keras_model, exported_model, token_ids, batch_size=PREDICT_BATCH_SIZE):
+    start = time.perf_counter()
+    expected = predict_probabilities(token_ids, keras_model, batch_size=batch_size)
+    keras_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = predict_probabilities(token_ids, exported_model, batch_size=batch_size)
+    exported_seconds = time.perf_counter() - start
+
+    diff = np.abs(expected - actual)
+    return {
+        'samples': len(token_ids),
+        'max_abs_diff': float(diff.max()) if len(diff) else 0.0,
+        'mean_abs_diff': float(diff.mean()) if len(diff) else 0.0,
+        'label_agreement': float((np.round(expected) == np.round(actual)).mean()) if len(diff) else 1.0,
+        'keras_seconds': keras_seconds,
+        'exported_seconds': exported_seconds,
+    }
+
+
+# 학습 데이터에서 비교용 문장 샘플 -> 토큰 id 리스트
+def sample_token_ids(data_path, samples, seed=0):
+    from training_data import load_training_sentences
+
+    sentences, _ = load_training_sentences(data_path)
+    rng = np.random.default_rng(seed)
+    picked = rng.choice(len(sentences), min(samples, len(sentences)), replace=False)
+    return tokenize_sentences([sentences[i] for i in picked])
+
+
+# 작은 설정으로 확인할 때 쓰는 임의 토큰 id 리스트 (길이 3 ~ MAX_LEN)
+def random_token_ids(samples, vocab_size, max_len=MAX_LEN, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.integers(1, vocab_size, int(length)).tolist() for length in rng.integers(3, max_len + 1, samples)]
+
+
+def print_report(report):
+    print(f"Parity on {report['samples']} sentences: max |diff| {report['max_abs_diff']:.2e}, "
+          f"mean |diff| {report['mean_abs_diff']:.2e}, label agreement {report['label_agreement']:.2%}")
+    print(f"Keras {report['keras_seconds']:.2f}s, exported {report['exported_seconds']:.2f}s")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="학습된 긍/부정 분류기를 TFLite 추론 모델로 내보내기")
+    parser.add_argument('--checkpoint', default=CHECKPOINT_PATH, help="학습된 keras 가중치 경로")
+    parser.add_argument('--output', default=None, help="저장 경로 (기본: 체크포인트 폴더의 model.tflite)")
+    parser.add_argument('--quantize', action='store_true', help="가중치 int8 dynamic-range 양자화")
+    parser.add_argument('--data', default=None, help="비교용 문장을 뽑을 학습 데이터 (기본: training_data.TRAIN_DATA_PATH)")
+    parser.add_argument('--samples', type=int, default=256, help="비교할 문장 수")
+    parser.add_argument('--tolerance', type=float, default=None, help="허용할 최대 확률 차이")
+    parser.add_argument('--tiny', action='store_true',
+                        help="임의 초기화한 작은 BERT로 내보내기/비교만 확인 (네트워크, 체크포인트 필요 없음)")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.tiny:
+        keras_model = build_tiny_classifier()
+        token_ids = random_token_ids(args.samples, TINY_BERT_CONFIG['vocab_size'])
+        output_path = args.output or os.path.join(tempfile.mkdtemp(), 'tiny' + TFLITE_SUFFIX)
+    else:
+        from training_data import TRAIN_DATA_PATH
+
+        keras_model = load_model(args.checkpoint)
+        token_ids = sample_token_ids(args.data or TRAIN_DATA_PATH, args.samples)
+        output_path = args.output or default_export_path(args.checkpoint, args.quantize)
+
+    export_tflite(keras_model, output_path, quantize=args.quantize)
+    print(f"Exported -> {output_path} ({os.path.getsize(output_path) / 2 ** 20:.1f} MB)")
+
+    report = check_parity(keras_model, TFLiteClassifier(output_path), token_ids)
+    print_report(report)
+    tolerance = args.tolerance or (QUANTIZED_TOLERANCE if args.quantize else FLOAT_TOLERANCE)
+    if report['max_abs_diff'] > tolerance:
+        print(f"Parity check failed: max |diff| {report['max_abs_diff']:.2e} > {tolerance:.2e}")
+        sys.exit(1)
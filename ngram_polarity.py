@@ -0,0 +1,235 @@
+import os
+import json
+import time
+import zlib
+import argparse
+
+import numpy as np
+
+from emotion_labels import POSITIVE_EMOTIONS, NEGATIVE_EMOTIONS
+from lyrics_emotion_analysis_KR import POLARITY_MODEL_PATHS, segment_sum
+
+NGRAM_MODEL_PATH = POLARITY_MODEL_PATHS['ngram']
+VOCAB_PATH = 'data/vocab_9class_500.csv'
+STOPWORDS_PATH = 'data/stopwords.txt'
+N_FEATURES = 1 << 18  # 문자 n-gram 해시 공간 크기
+NGRAM_RANGE = (1, 3)
+# 검증용 문장 비율 (학습 데이터가 라벨 순으로 정렬되어 있어 섞은 뒤 나눔)
+# BERT는 다른 방식으로 나눠 학습했으므로 BERT 정확도는 실제보다 높게 나올 수 있음
+VALID_SPLIT = 0.2
+
+
+# 문장 -> 문자 n-gram 리스트 (공백 정규화, 단어 경계는 공백으로 표시)
+def char_ngrams(sentence, ngram_range=NGRAM_RANGE):
+    text = ' ' + ' '.join(sentence.split()) + ' '
+    low, high = ngram_range
+    return [text[i:i + n] for n in range(low, high + 1) for i in range(len(text) - n + 1)]
+
+
+# 여러 문장 -> 해시된 n-gram 번호, 값(문장별 L2 정규화된 등장 여부), 문장별 개수
+def hash_ngrams(sentences, n_features=N_FEATURES):
+    indices, lengths = [], []
+    for sentence in sentences:
+        ids = sorted({zlib.crc32(ngram.encode('utf-8')) % n_features for ngram in char_ngrams(sentence)})
+        indices.extend(ids)
+        lengths.append(len(ids))
+    lengths = np.array(lengths, dtype=np.int64)
+    values = np.repeat(1.0 / np.sqrt(np.maximum(lengths, 1)), lengths).astype(np.float32)
+    return np.array(indices, dtype=np.int64), values, lengths
+
+
+# 감정 어휘 사전 -> 단어별 (긍정 감정 점수 합, 부정 감정 점수 합)
+def lexicon_polarity_weights(lexicon):
+    positive = [lexicon.emotions.index(e) for e in POSITIVE_EMOTIONS if e in lexicon.emotions]
+    negative = [lexicon.emotions.index(e) for e in NEGATIVE_EMOTIONS if e in lexicon.emotions]
+    weights = np.stack([lexicon.matrix[:, positive].sum(axis=1), lexicon.matrix[:, negative].sum(axis=1)], axis=1)
+    return list(lexicon.index), weights.astype(np.float32)
+
+
+class NgramPolarityModel:
+    # 문자 n-gram + 감정 사전 특징의 로지스틱 회귀 긍/부정 모델 (BERT 대신 쓰는 가벼운 backend)
+    # lexicon_words가 있으면 Komoran 형태소 분석 결과로 문장별 긍정/부정 사전 점수를 특징에 더함
+    def __init__(self, weights, bias, dense_weights=None, lexicon_words=None, lexicon_weights=None,
+                 n_features=N_FEATURES, metrics=None):
+        self.weights = weights
+        self.bias = float(bias)
+        self.dense_weights = dense_weights if dense_weights is not None else np.zeros(0, dtype=np.float32)
+        self.lexicon_words = list(lexicon_words) if lexicon_words is not None else []
+        self.lexicon_weights = lexicon_weights
+        self.lexicon_index = {word: i for i, word in enumerate(self.lexicon_words)}
+        self.n_features = n_features
+        self.metrics = metrics or {}
+
+    # 문장별 (긍정 사전 점수, 부정 사전 점수) -> [log1p(긍정), log1p(부정), (긍정 - 부정) / 합]
+    def dense_features(self, sentences):
+        if not self.lexicon_words:
+            return np.zeros((len(sentences), 0), dtype=np.float32)
+        from lyrics_emotion_analysis_KR import get_komoran_tokenizer
+
+        rows = [[self.lexicon_index[word] for word in words if word in self.lexicon_index]
+                for words in get_komoran_tokenizer().tokenize_batch(sentences)]
+        lengths = np.array([len(row) for row in rows], dtype=np.int64)
+        word_ids = np.fromiter((i for row in rows for i in row), dtype=np.int64, count=int(lengths.sum()))
+        sums = segment_sum(self.lexicon_weights[word_ids], lengths, 2)
+        positive, negative = sums[:, 0], sums[:, 1]
+        return np.stack([np.log1p(positive), np.log1p(negative),
+                         (positive - negative) / (positive + negative + 1e-6)], axis=1).astype(np.float32)
+
+    def features(self, sentences):
+        return hash_ngrams(sentences, self.n_features) + (self.dense_features(sentences),)
+
+    def predict_features(self, indices, values, lengths, dense):
+        rows = np.repeat(np.arange(len(lengths)), lengths)
+        logits = np.bincount(rows, weights=self.weights[indices] * values, minlength=len(lengths))
+        logits = logits + dense @ self.dense_weights + self.bias
+        return (1.0 / (1.0 + np.exp(-logits))).astype(np.float32)
+
+    # 문장 리스트 -> 문장별 긍정 확률 (lyrics_evaluation_predict_batch에서 호출)
+    def predict_sentences(self, sentences):
+        if len(sentences) == 0:
+            return np.zeros(0, dtype=np.float32)
+        return self.predict_features(*self.features(sentences))
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp.npz'
+        np.savez_compressed(tmp_path, weights=self.weights, bias=np.float32(self.bias),
+                            dense_weights=self.dense_weights,
+                            lexicon_words=np.array(self.lexicon_words, dtype=str),
+                            lexicon_weights=self.lexicon_weights if self.lexicon_weights is not None
+                            else np.zeros((0, 2), dtype=np.float32),
+                            n_features=np.int64(self.n_features),
+                            metrics=np.array(json.dumps(self.metrics, ensure_ascii=False)))
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['weights'], data['bias'], data['dense_weights'], data['lexicon_words'].tolist(),
+                       data['lexicon_weights'], int(data['n_features']), json.loads(str(data['metrics'])))
+
+
+# 로지스틱 회귀 (전체 배치 Adam, L2 규제)
+# targets는 0/1 라벨 또는 BERT 확률(soft label) 모두 가능
+def fit_logistic(indices, values, lengths, dense, targets, n_features=N_FEATURES, epochs=100,
+                 learning_rate=0.05, l2=1e-5):
+    n = len(lengths)
+    rows = np.repeat(np.arange(n), lengths)
+    params = [np.zeros(n_features, dtype=np.float64), np.zeros(dense.shape[1], dtype=np.float64), np.zeros(1)]
+    moments = [(np.zeros_like(p), np.zeros_like(p)) for p in params]
+    beta1, beta2 = 0.9, 0.999
+    for step in range(1, epochs + 1):
+        weights, dense_weights, bias = params
+        logits = np.bincount(rows, weights=weights[indices] * values, minlength=n) + dense @ dense_weights + bias
+        error = (1.0 / (1.0 + np.exp(-logits)) - targets) / n
+        grads = [np.bincount(indices, weights=error[rows] * values, minlength=n_features) + l2 * weights,
+                 dense.T @ error + l2 * dense_weights,
+                 np.array([error.sum()])]
+        for param, grad, (m, v) in zip(params, grads, moments):
+            m *= beta1
+            m += (1 - beta1) * grad
+            v *= beta2
+            v += (1 - beta2) * grad ** 2
+            param -= learning_rate * (m / (1 - beta1 ** step)) / (np.sqrt(v / (1 - beta2 ** step)) + 1e-8)
+    weights, dense_weights, bias = params
+    return weights.astype(np.float32), dense_weights.astype(np.float32), float(bias[0])
+
+
+# 가사 CSV에서 BERT가 판별할 추가 문장 (라벨 없는 문장 증류용)
+def unlabeled_sentences(csv_path, songs, seed=0):
+    from columnar_store import read_table
+    from lyrics_preprocessing import lyrics_to_corpus, sentence_preprocessing
+
+    lyrics = [lyric for lyric in read_table(csv_path, ['lyric'])['lyric'] if isinstance(lyric, str)]
+    rng = np.random.default_rng(seed)
+    picked = rng.choice(len(lyrics), min(songs, len(lyrics)), replace=False)
+    sentences = [sentence for i in picked for sentence in sentence_preprocessing(lyrics_to_corpus(lyrics[i]))]
+    return list(dict.fromkeys(sentences))
+
+
+# 학습 데이터 라벨(+ BERT 판별 결과)로 모델 학습, 섞은 뒤 VALID_SPLIT 비율의 문장으로 정확도 측정
+# teacher : BERT(또는 TFLite) 모델, 주어지면 목표값 = (1 - distill_weight) * 라벨 + distill_weight * BERT 확률
+def train(data_path, lexicon=None, teacher=None, distill_weight=0.5, unlabeled=(), epochs=100, seed=0):
+    from training_data import load_training_sentences
+    from lyrics_emotion_analysis_KR import predict_sentence_probabilities
+
+    sentences, labels = load_training_sentences(data_path)
+    order = np.random.default_rng(seed).permutation(len(sentences))
+    sentences = [sentences[i] for i in order]
+    labels = np.asarray(labels, dtype=np.float64)[order]
+    n_train = len(sentences) - int(len(sentences) * VALID_SPLIT)
+    train_sentences, valid_sentences = sentences[:n_train], sentences[n_train:]
+
+    targets = labels[:n_train]
+    valid_set = set(valid_sentences)
+    unlabeled = [sentence for sentence in unlabeled if sentence not in valid_set]
+    teacher_valid = None
+    if teacher is not None:
+        teacher_train = predict_sentence_probabilities(train_sentences + unlabeled, teacher).astype(np.float64)
+        teacher_valid = predict_sentence_probabilities(valid_sentences, teacher)
+        targets = np.concatenate([(1 - distill_weight) * targets + distill_weight * teacher_train[:n_train],
+                                  teacher_train[n_train:]])
+        train_sentences = train_sentences + unlabeled
+
+    words, lexicon_weights = lexicon_polarity_weights(lexicon) if lexicon is not None else (None, None)
+    model = NgramPolarityModel(np.zeros(N_FEATURES, dtype=np.float32), 0.0,
+                               np.zeros(3 if words else 0, dtype=np.float32), words, lexicon_weights)
+    start = time.perf_counter()
+    model.weights, model.dense_weights, model.bias = fit_logistic(*model.features(train_sentences), targets,
+                                                                  epochs=epochs)
+    train_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predicted = np.round(model.predict_sentences(valid_sentences))
+    predict_seconds = time.perf_counter() - start
+    metrics = {
+        'train_sentences': len(train_sentences),
+        'valid_sentences': len(valid_sentences),
+        'valid_accuracy': float((predicted == labels[n_train:]).mean()),
+        'sentences_per_second': len(valid_sentences) / predict_seconds if predict_seconds else 0.0,
+        'train_seconds': train_seconds,
+    }
+    if teacher_valid is not None:
+        metrics['teacher_valid_accuracy'] = float((np.round(teacher_valid) == labels[n_train:]).mean())
+        metrics['teacher_agreement'] = float((np.round(teacher_valid) == predicted).mean())
+    model.metrics = metrics
+    return model
+
+
+def print_metrics(metrics):
+    print(f"Trained on {metrics['train_sentences']} sentences ({metrics['train_seconds']:.1f}s)")
+    print(f"Valid accuracy: {metrics['valid_accuracy']:.2%} on {metrics['valid_sentences']} sentences, "
+          f"{metrics['sentences_per_second']:.0f} sentences/sec")
+    if 'teacher_valid_accuracy' in metrics:
+        print(f"BERT valid accuracy: {metrics['teacher_valid_accuracy']:.2%}, "
+              f"agreement with BERT: {metrics['teacher_agreement']:.2%}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="문자 n-gram 긍/부정 모델 학습 (BERT 대신 쓰는 가벼운 backend)")
+    parser.add_argument('--data', default=None, help="학습 데이터 (기본: training_data.TRAIN_DATA_PATH)")
+    parser.add_argument('--output', default=NGRAM_MODEL_PATH)
+    parser.add_argument('--teacher', default=None,
+                        help="증류에 쓸 BERT 모델 (backend 이름 bert/tflite 또는 경로, 없으면 라벨만으로 학습)")
+    parser.add_argument('--distill-weight', type=float, default=0.5, help="목표값 중 BERT 확률 비중")
+    parser.add_argument('--unlabeled', default=None, help="BERT 판별 결과로 추가 학습할 가사 CSV (lyric 컬럼)")
+    parser.add_argument('--unlabeled-songs', type=int, default=2000, help="추가 학습에 쓸 곡 수")
+    parser.add_argument('--no-lexicon', action='store_true', help="감정 사전 특징 사용 안 함 (Komoran 불필요)")
+    parser.add_argument('--epochs', type=int, default=100)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    from training_data import TRAIN_DATA_PATH
+    from lyrics_emotion_analysis_KR import load_lexicon
+
+    args = parse_args()
+    lexicon = None if args.no_lexicon else load_lexicon(VOCAB_PATH, STOPWORDS_PATH)
+    if args.unlabeled and not args.teacher:
+        print("--unlabeled needs --teacher (ignored)")
+    extra = unlabeled_sentences(args.unlabeled, args.unlabeled_songs) if args.unlabeled and args.teacher else ()
+    model = train(args.data or TRAIN_DATA_PATH, lexicon=lexicon, teacher=args.teacher,
+                  distill_weight=args.distill_weight, unlabeled=extra, epochs=args.epochs)
+    print_metrics(model.metrics)
+    print(f"Saved -> {model.save(args.output)}")
@@ -0,0 +1,167 @@
+import os
+import time
+import sqlite3
+import hashlib
+from collections import OrderedDict
+
+SQLITE_MAX_VARIABLES = 900  # IN (...) 조회 한 번에 넣을 최대 키 수
+
+
+# 모델 체크포인트 파일 목록 (best_model.index, best_model.data-* 또는 SavedModel 폴더)
+def _checkpoint_files(checkpoint_path):
+    if os.path.isdir(checkpoint_path):
+        return sorted(os.path.join(root, name)
+                      for root, _, names in os.walk(checkpoint_path) for name in names)
+    directory = os.path.dirname(checkpoint_path) or '.'
+    prefix = os.path.basename(checkpoint_path)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.startswith(prefix))
+
+
+# 체크포인트 내용 해시 (모델이 바뀌면 캐시 키도 바뀜)
+def model_fingerprint(checkpoint_path):
+    h = hashlib.sha1()
+    for path in _checkpoint_files(checkpoint_path):
+        h.update(os.path.relpath(path, os.path.dirname(checkpoint_path)).encode('utf-8'))
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+    return h.hexdigest()[:16]
+
+
+# 캐시 키 : 전처리된 문장의 공백 정규화
+def sentence_key(sentence):
+    return " ".join(sentence.split())
+
+
+def format_stats(stats):
+    return ("polarity cache - memory hit: {memory_hits}, disk hit: {disk_hits}, miss: {misses}, "
+            "hit rate: {hit_rate:.1%}, model {predict_seconds:.1f}s (saved ~{saved_seconds:.1f}s)").format(**stats)
+
+
+# 여러 캐시(워커별)의 통계 합산
+def merge_stats(stats_list):
+    stats_list = list(stats_list)
+    total = {key: sum(s[key] for s in stats_list)
+             for key in ('memory_hits', 'disk_hits', 'misses', 'predict_seconds', 'saved_seconds')}
+    lookups = total['memory_hits'] + total['disk_hits'] + total['misses']
+    total['hit_rate'] = (total['memory_hits'] + total['disk_hits']) / lookups if lookups else 0.0
+    return total
+
+
+class PolarityCache:
+    # 문장 긍/부정 결과 캐시 (메모리 LRU + SQLite)
+    def __init__(self, db_path=None, fingerprint='', max_memory_items=100000):
+        self.fingerprint = fingerprint
+        self.max_memory_items = max_memory_items
+        self.memory = OrderedDict()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.predict_seconds = 0.0
+        # 이전 실행까지 누적된 모델 예측 시간/문장 수 (모두 캐시에 있는 재실행에서도 절약 시간 추정에 사용)
+        self.previous_seconds = 0.0
+        self.previous_sentences = 0
+
+        self.conn = None
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+            self.conn = sqlite3.connect(db_path, timeout=60)  # 여러 워커가 같은 파일을 씀
+            self.conn.execute("CREATE TABLE IF NOT EXISTS polarity ("
+                              "fingerprint TEXT, sentence TEXT, polarity INTEGER, "
+                              "PRIMARY KEY (fingerprint, sentence))")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS model_cost ("
+                              "fingerprint TEXT PRIMARY KEY, seconds REAL, sentences INTEGER)")
+            self.conn.commit()
+            row = self.conn.execute("SELECT seconds, sentences FROM model_cost WHERE fingerprint = ?",
+                                    (self.fingerprint,)).fetchone()
+            if row is not None:
+                self.previous_seconds, self.previous_sentences = row
+
+    def _remember(self, key, polarity):
+        self.memory[key] = polarity
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.max_memory_items:
+            self.memory.popitem(last=False)
+
+    def _disk_get(self, keys):
+        found = {}
+        if self.conn is None:
+            return found
+        for start in range(0, len(keys), SQLITE_MAX_VARIABLES):
+            chunk = keys[start:start + SQLITE_MAX_VARIABLES]
+            rows = self.conn.execute(
+                "SELECT sentence, polarity FROM polarity WHERE fingerprint = ? AND sentence IN ({})".format(
+                    ",".join("?" * len(chunk))),
+                [self.fingerprint] + chunk)
+            found.update(rows)
+        return found
+
+    def _disk_put(self, items, seconds):
+        if self.conn is None or not items:
+            return
+        self.conn.executemany("INSERT OR REPLACE INTO polarity VALUES (?, ?, ?)",
+                              [(self.fingerprint, key, polarity) for key, polarity in items.items()])
+        self.conn.execute("INSERT INTO model_cost VALUES (?, ?, ?) ON CONFLICT (fingerprint) DO UPDATE SET "
+                          "seconds = seconds + excluded.seconds, sentences = sentences + excluded.sentences",
+                          (self.fingerprint, seconds, len(items)))
+        self.conn.commit()
+
+    # 캐시에 없는 문장만 predict_fn(문장 리스트 -> 긍/부정 리스트)으로 예측
+    def lookup_or_predict(self, sentences, predict_fn):
+        keys = [sentence_key(sentence) for sentence in sentences]
+        result = {}
+
+        disk_keys = []
+        for key in dict.fromkeys(keys):
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                result[key] = self.memory[key]
+                self.memory_hits += 1
+            else:
+                disk_keys.append(key)
+
+        for key, polarity in self._disk_get(disk_keys).items():
+            result[key] = polarity
+            self._remember(key, polarity)
+            self.disk_hits += 1
+
+        missing = [key for key in disk_keys if key not in result]
+        if missing:
+            self.misses += len(missing)
+            start = time.perf_counter()
+            predicted = dict(zip(missing, predict_fn(missing)))
+            seconds = time.perf_counter() - start
+            self.predict_seconds += seconds
+
+            for key, polarity in predicted.items():
+                result[key] = polarity
+                self._remember(key, polarity)
+            self._disk_put(predicted, seconds)
+
+        return [result[key] for key in keys]
+
+    def stats(self):
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        sentences = self.previous_sentences + self.misses
+        per_sentence = (self.previous_seconds + self.predict_seconds) / sentences if sentences else 0.0
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': hits / total if total else 0.0,
+            'predict_seconds': self.predict_seconds,
+            # 캐시 적중 문장 수 * 문장당 평균 예측 시간 (이전 실행 포함)
+            'saved_seconds': hits * per_sentence,
+        }
+
+    def report(self):
+        return format_stats(self.stats())
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
@@ -0,0 +1,218 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+
+from emotion_labels import EMOTION_LABELS, to_korean_label
+from emotion_search import EmotionIndex
+from columnar_store import read_table
+
+DEFAULT_CSV_PATH = 'data/Final_lyrics_emotion_analysis.csv'
+EMOTION_COLUMNS = ['emotion1', 'emotion2', 'emotion3']
+SONG_COLUMNS = ['singer', 'title', 'genre']
+EMOTIONS = list(EMOTION_LABELS.values())
+
+# 감정 비율 컬럼이 없을 때 순위별 가중치 (emotion1 > emotion2 > emotion3)
+RANK_WEIGHTS = {'emotion1': 1.0, 'emotion2': 0.5, 'emotion3': 0.25}
+TOP_K = 50  # 감정별로 미리 정렬해 두는 곡 수
+GENRE_PENALTY = 0.5  # 장르 다양화 : 같은 장르가 이미 뽑힌 횟수만큼 점수에 곱함
+
+
+# 곡별 감정 프로필 (곡 수 x 감정 수)
+# 감정별 비율 컬럼(감정 코드 또는 한국어 라벨, hybrid_emotion_export_persent 결과)이 있으면 그 값을,
+# 없으면 emotion1/2/3 순위 가중치를 사용
+def emotion_profiles(df):
+    profiles = np.zeros((len(df), len(EMOTIONS)), dtype=np.float32)
+    share_columns = {column: to_korean_label(column) for column in df.columns
+                     if to_korean_label(column) in EMOTIONS and column not in EMOTION_COLUMNS}
+    if share_columns:
+        for column, emotion in share_columns.items():
+            values = pd.to_numeric(df[column], errors='coerce').fillna(0).to_numpy(dtype=np.float32)
+            profiles[:, EMOTIONS.index(emotion)] += values
+        return profiles
+
+    for column, weight in RANK_WEIGHTS.items():
+        if column not in df.columns:
+            continue
+        for i, emotion in enumerate(df[column]):
+            emotion = to_korean_label(emotion)
+            if emotion in EMOTIONS:
+                profiles[i, EMOTIONS.index(emotion)] = max(profiles[i, EMOTIONS.index(emotion)], weight)
+    return profiles
+
+
+# 감정 라벨 또는 {감정 라벨/코드: 비율} -> EMOTIONS 순서의 벡터
+def query_vector(emotion):
+    weights = emotion if isinstance(emotion, dict) else {emotion: 1.0}
+    vector = np.zeros(len(EMOTIONS), dtype=np.float32)
+    for label, weight in weights.items():
+        label = to_korean_label(label)
+        if label in EMOTIONS:
+            vector[EMOTIONS.index(label)] += weight
+    return vector
+
+
+# 점수가 있는 곡을 점수 순으로 (같은 점수는 파일 순서)
+def rank_rows(scores, top_k=TOP_K):
+    order = np.argsort(-scores, kind='stable')
+    return [int(i) for i in order[:top_k] if scores[i] > 0]
+
+
+# 점수 순으로 하나씩 뽑되 이미 뽑힌 장르는 GENRE_PENALTY^(뽑힌 횟수)만큼 점수를 낮춤
+# (앞에서부터 자른 목록도 그 길이에서의 다양화 결과가 되도록 순서대로 뽑음)
+def diversify_rows(rows, scores, genres, top_k=TOP_K, penalty=GENRE_PENALTY):
+    remaining = list(rows)
+    used = {}
+    chosen = []
+    while remaining and len(chosen) < top_k:
+        best = max(range(len(remaining)),
+                   key=lambda j: scores[remaining[j]] * penalty ** used.get(genres[remaining[j]], 0))
+        row = remaining.pop(best)
+        used[genres[row]] = used.get(genres[row], 0) + 1
+        chosen.append(row)
+    return chosen
+
+
+class CatalogData:
+    # 한 번 읽은 카탈로그 내용 (만든 뒤에는 바꾸지 않음, 다시 읽으면 새 객체로 통째로 교체)
+    # 감정별 유사도 인덱스만 처음 검색할 때 만들어 채움
+    def __init__(self, songs=(), index=None, playlists=None, search_rows=None, search_vectors=None):
+        self.songs = list(songs)
+        self.index = index or {column: {} for column in EMOTION_COLUMNS}
+        self.playlists = playlists or {False: {}, True: {}}  # 장르 다양화 여부 -> {감정: 행 번호 리스트}
+        # 유사도 검색 대상 행 번호와 그 감정 벡터
+        self.search_rows = search_rows if search_rows is not None else np.zeros(0, dtype=np.int64)
+        self.search_vectors = search_vectors if search_vectors is not None else \
+            np.zeros((0, len(EMOTIONS)), dtype=np.float32)
+        self._indexes = {}  # metric -> EmotionIndex
+        self._lock = threading.Lock()
+
+    def emotion_index(self, metric):
+        with self._lock:
+            if metric not in self._indexes:
+                self._indexes[metric] = EmotionIndex(self.search_vectors, metric=metric)
+            return self._indexes[metric]
+
+
+EMPTY_CATALOG = CatalogData()
+
+
+class SongCatalog:
+    # 추천용 노래 목록을 한 번만 읽어 두고 감정별 인덱스로 조회
+    # (파일 수정 시간이 바뀐 경우에만 다시 읽음)
+    # 읽을 때 감정별 추천 순위(점수 순 / 장르 다양화)를 top_k개까지 미리 계산해 둠
+    # 읽은 내용은 CatalogData 하나로 교체하므로 다른 스레드가 다시 읽는 중에도 조회마다 한 시점의 내용만 사용
+    def __init__(self, csv_path=DEFAULT_CSV_PATH, top_k=TOP_K):
+        self.csv_path = csv_path
+        self.top_k = top_k
+        self.mtime = None
+        self.data = EMPTY_CATALOG
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            # 최신 컬럼 저장소가 있으면 CSV 파싱 없이 읽음
+            df = read_table(self.csv_path)
+            required_columns = {'emotion1', 'singer', 'title', 'genre'}
+
+            if not required_columns.issubset(df.columns):
+                print(f"Missing columns. Required: {required_columns}")
+                return EMPTY_CATALOG
+
+            songs = df[SONG_COLUMNS].to_dict(orient='records')
+            # 감정 컬럼별로 감정 -> 행 번호 리스트를 미리 만들어 둠
+            index = {column: {} for column in EMOTION_COLUMNS}
+            for column in EMOTION_COLUMNS:
+                if column not in df.columns:
+                    continue
+                for i, emotion in enumerate(df[column].astype(str).str.strip()):
+                    index[column].setdefault(emotion, []).append(i)
+
+            profiles = emotion_profiles(df)
+            # 같은 곡이 여러 행에 있으면 첫 행만 추천
+            profiles[df.duplicated(subset=['singer', 'title']).to_numpy()] = 0
+            genres = df['genre'].astype(str).tolist()
+            playlists = {False: {}, True: {}}
+            for k, emotion in enumerate(EMOTIONS):
+                scores = profiles[:, k]
+                rows = rank_rows(scores, self.top_k)
+                if rows:
+                    playlists[False][emotion] = rows
+                    # 다양화 후보는 상위 곡 몇 배수까지만
+                    playlists[True][emotion] = diversify_rows(
+                        rank_rows(scores, self.top_k * 4), scores, genres, self.top_k)
+
+            # 유사도 검색은 감정 점수가 있는 곡만
+            search_rows = np.flatnonzero(profiles.sum(axis=1) > 0)
+            return CatalogData(songs, index, playlists, search_rows, profiles[search_rows])
+        except Exception as e:
+            print(f"Error reading CSV: {e}")
+            return EMPTY_CATALOG
+
+    # 파일이 바뀌었으면 다시 읽은 뒤 현재 내용 (파일이 없으면 빈 카탈로그)
+    def snapshot(self):
+        try:
+            mtime = os.path.getmtime(self.csv_path)
+        except OSError:
+            # 절대 경로로 시도하거나, 상위 디렉토리 확인 등 예외 처리 강화 가능
+            print(f"File not found: {self.csv_path}")
+            with self._lock:
+                self.mtime = None
+                self.data = EMPTY_CATALOG
+            return EMPTY_CATALOG
+
+        if mtime != self.mtime:
+            with self._lock:
+                if mtime != self.mtime:
+                    self.data = self._load()
+                    self.mtime = mtime
+        return self.data
+
+    # 감정이 column(기본 emotion1)인 노래를 파일 순서대로 최대 limit개
+    def get_songs(self, emotion, column='emotion1', limit=None):
+        data = self.snapshot()
+        rows = data.index[column].get(emotion, [])
+        if limit is not None:
+            rows = rows[:limit]
+        return [data.songs[i] for i in rows]
+
+    # 감정 프로필 점수 순 추천 곡 (미리 계산한 목록에서 앞의 limit개, 최대 top_k개)
+    # diversify=True면 같은 장르가 몰리지 않게 고른 순서
+    def rank_songs(self, emotion, limit=None, diversify=False):
+        data = self.snapshot()
+        rows = data.playlists[bool(diversify)].get(emotion, [])
+        if limit is not None:
+            rows = rows[:limit]
+        return [data.songs[i] for i in rows]
+
+    # 감정 비율이 질의와 가장 가까운 곡 k개 (emotion : 감정 라벨 또는 {감정 라벨/코드: 비율})
+    # 9가지 감정에 없는 라벨만 주어지면 (예 : LLM이 '기쁨'으로 답한 경우) 빈 리스트
+    def nearest_songs(self, emotion, k=6, metric='cosine'):
+        return self.nearest_songs_batch([emotion], k, metric)[0]
+
+    def nearest_songs_batch(self, emotions, k=6, metric='cosine'):
+        data = self.snapshot()
+        queries = [query_vector(emotion) for emotion in emotions]
+        known = [i for i, query in enumerate(queries) if query.any()]
+        results = [[] for _ in emotions]
+        if known and len(data.search_rows):
+            indices, _ = data.emotion_index(metric).query_batch([queries[i] for i in known], k)
+            for i, rows in zip(known, indices):
+                results[i] = [data.songs[data.search_rows[row]] for row in rows]
+        return results
+
+    def __len__(self):
+        return len(self.snapshot().songs)
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+# 경로별로 하나의 SongCatalog를 공유 (Streamlit 리런/세션 간 재사용)
+def get_catalog(csv_path=DEFAULT_CSV_PATH):
+    key = os.path.abspath(csv_path)
+    with _catalogs_lock:
+        if key not in _catalogs:
+            _catalogs[key] = SongCatalog(csv_path)
+        return _catalogs[key]
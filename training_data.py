@@ -0,0 +1,120 @@
+import os
+import json
+import hashlib
+
+import numpy as np
+
+from lyrics_emotion_analysis_KR import get_fast_bert_tokenizer, BERT_MODEL_NAME, MAX_LEN, PAD_MULTIPLE
+
+TRAIN_DATA_PATH = 'data/train_data.xlsx'
+ENCODED_CACHE_DIR = os.path.join('cache', 'train_encoded')
+# 토큰화 방식이나 저장 형식이 바뀌면 올려서 이전 캐시를 쓰지 않게 함
+ENCODING_VERSION = 1
+TOKENIZE_BATCH_SIZE = 1024
+INPUT_KEYS = ('input_ids', 'attention_mask', 'token_type_ids')
+
+
+def get_sentiment(emotion):
+    if emotion == 0:
+        return None
+    # 긍정적인 감정은 1로 치환
+    elif (emotion == 1 or emotion == 2 or emotion == 3):
+        return 1
+    # 부정적인 감정은 0으로 치환
+    elif (emotion == 4 or emotion == 5 or emotion == 6):
+        return 0
+
+
+# 학습 데이터 불러오기 -> (문장 리스트, 긍/부정 라벨 리스트)
+def load_training_sentences(data_path=TRAIN_DATA_PATH):
+    import pandas as pd
+
+    data = pd.read_excel(data_path)
+
+    # 라벨링 된 데이터만 불러오기
+    data = data[data['sentiment'].notnull()]
+
+    # 긍/부정 치환
+    data['sentiment'] = data['sentiment'].map(lambda x : get_sentiment(x))
+
+    data = data[(data['sentiment'] == 1) | (data['sentiment'] == 0)]
+    # 문장이 비어 있는 행 제거 (토큰화할 수 없음)
+    data = data[data['lyrics splited'].map(lambda x: isinstance(x, str))]
+    return data['lyrics splited'].tolist(), data['sentiment'].astype('int64').tolist()
+
+
+# 여러 문장을 한 번에 토큰화 -> {input_ids, attention_mask, token_type_ids} (문장 수 x max_len, int32)
+def encode_sentences(sentences, max_len, tokenizer=None, batch_size=TOKENIZE_BATCH_SIZE):
+    tokenizer = tokenizer or get_fast_bert_tokenizer()
+    encoded = {key: np.zeros((len(sentences), max_len), dtype=np.int32) for key in INPUT_KEYS}
+    for start in range(0, len(sentences), batch_size):
+        batch = tokenizer(sentences[start:start + batch_size], add_special_tokens=True, max_length=max_len,
+                          padding='max_length', truncation=True, return_attention_mask=True,
+                          return_token_type_ids=True, return_tensors='np')
+        for key in INPUT_KEYS:
+            encoded[key][start:start + len(batch[key])] = batch[key]
+    return encoded
+
+
+# 데이터 파일 내용 + 토큰화 설정으로 만든 캐시 키 (어느 하나라도 바뀌면 새로 토큰화)
+def encoding_key(data_path, max_len):
+    h = hashlib.sha1()
+    with open(data_path, 'rb') as f:
+        h.update(f.read())
+    h.update(json.dumps({'version': ENCODING_VERSION, 'tokenizer': BERT_MODEL_NAME,
+                         'max_len': max_len}).encode('utf-8'))
+    return h.hexdigest()[:16]
+
+
+# 토큰화된 학습 데이터 (캐시 파일이 있으면 그대로 읽고, 없으면 만들어 저장)
+def load_encoded(data_path=TRAIN_DATA_PATH, max_len=MAX_LEN, cache_dir=ENCODED_CACHE_DIR, tokenizer=None):
+    cache_path = os.path.join(cache_dir, f"{os.path.splitext(os.path.basename(data_path))[0]}_"
+                                         f"v{ENCODING_VERSION}_{encoding_key(data_path, max_len)}.npz")
+    if os.path.exists(cache_path):
+        with np.load(cache_path) as cached:
+            print(f"Encoded training data loaded from cache: {cache_path}")
+            return {key: cached[key] for key in cached.files}
+
+    sentences, labels = load_training_sentences(data_path)
+    encoded = encode_sentences(sentences, max_len, tokenizer=tokenizer)
+    encoded['labels'] = np.asarray(labels, dtype=np.int32)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = cache_path + '.tmp.npz'
+    np.savez(tmp_path, **encoded)
+    os.replace(tmp_path, cache_path)
+    print(f"Encoded {len(sentences)} sentences -> {cache_path}")
+    return encoded
+
+
+# 토큰화된 데이터 -> (학습 tf.data, 검증 tf.data)
+# 학습 파일은 라벨 순으로 정렬되어 있으므로 seed로 섞은 뒤 뒤쪽 valid_split 비율을 검증 데이터로 사용
+# 문장 길이(PAD_MULTIPLE 단위) 구간별로 배치를 만들고, 배치마다 가장 긴 문장 길이까지만 남기고 padding을 잘라냄
+def make_datasets(encoded, batch_size=16, valid_split=0.3, seed=1234):
+    import tensorflow as tf
+
+    n_valid = int(len(encoded['labels']) * valid_split)
+    n_train = len(encoded['labels']) - n_valid
+    order = np.random.default_rng(seed).permutation(len(encoded['labels']))
+    arrays = tuple(np.asarray(encoded[key])[order] for key in INPUT_KEYS + ('labels',))
+    max_len = encoded['input_ids'].shape[1]
+    boundaries = list(range(PAD_MULTIPLE + 1, max_len + 1, PAD_MULTIPLE))
+
+    def sequence_length(input_ids, attention_mask, token_type_ids, labels):
+        return tf.reduce_sum(attention_mask)
+
+    def to_model_inputs(input_ids, attention_mask, token_type_ids, labels):
+        length = tf.reduce_max(tf.reduce_sum(attention_mask, axis=1))
+        length = tf.minimum((length + PAD_MULTIPLE - 1) // PAD_MULTIPLE * PAD_MULTIPLE, tf.shape(input_ids)[1])
+        return (input_ids[:, :length], attention_mask[:, :length], token_type_ids[:, :length]), labels
+
+    def build(start, stop, shuffle):
+        dataset = tf.data.Dataset.from_tensor_slices(tuple(array[start:stop] for array in arrays))
+        if shuffle:
+            dataset = dataset.shuffle(stop - start, seed=seed, reshuffle_each_iteration=True)
+        dataset = dataset.bucket_by_sequence_length(sequence_length, boundaries,
+                                                    [batch_size] * (len(boundaries) + 1))
+        dataset = dataset.map(to_model_inputs, num_parallel_calls=tf.data.AUTOTUNE)
+        return dataset.prefetch(tf.data.AUTOTUNE)
+
+    return build(0, n_train, True), build(n_train, n_train + n_valid, False)